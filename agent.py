@@ -3,60 +3,306 @@ LangGraph-based ReAct Agent for E-Commerce Order Resolution
 Implements production-grade agentic reasoning with state management
 """
 
-import json
-from typing import Dict, Any, List, Optional, Annotated, TypedDict
+import asyncio
+import contextvars
+import copy
+import re
+import threading
+import uuid
+from functools import cached_property
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Annotated, TypedDict, Union
+from typing_extensions import NotRequired
 from datetime import datetime
-import operator
+
+import orjson
+import aiosqlite
+from aiolimiter import AsyncLimiter
 
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 import config
-from tools import (
-    get_order_status, 
-    get_refund_status, 
-    get_inventory,
-    get_user_orders,
-    ToolStatus
-)
+from tools import AVAILABLE_TOOLS, execute_tool_async
+from order_simulator import get_simulator
 from retriever import PolicyRetriever
+from cache import SemanticLLMCache
+
+
+# Messages retained in graph state (and in the checkpoint) per conversation thread
+_MAX_MESSAGES = 16
+
+
+def _bounded_append(old: List[Any], new: List[Any]) -> List[Any]:
+    """Message reducer: append, keeping only the most recent _MAX_MESSAGES"""
+    return (old + new)[-_MAX_MESSAGES:]
 
 
 # Define Agent State
 class AgentState(TypedDict):
-    """State that flows through the LangGraph nodes"""
+    """
+    State that flows through the LangGraph nodes
+    
+    Nodes return partial updates (only the keys they change); fields other than
+    the run inputs are filled in by the plan node.
+    """
     # Input
     query: str
     user_id: str
     
     # Planning
-    identified_intents: List[str]
-    missing_information: List[str]
-    planned_steps: List[str]
-    requires_clarification: bool
+    identified_intents: NotRequired[List[str]]
+    missing_information: NotRequired[List[str]]
+    planned_steps: NotRequired[List[str]]
+    parallel_tools: NotRequired[List[Dict[str, str]]]  # Independent calls run before the first think step
+    requires_clarification: NotRequired[bool]
     
     # Execution
-    current_step: int
-    iteration_count: int
-    messages: Annotated[List[Any], operator.add]
-    last_action: Optional[str]  # FIX: Add this to preserve action between nodes
-    last_action_input: Optional[str]  # FIX: Add this too
+    current_step: NotRequired[int]
+    iteration_count: NotRequired[int]
+    messages: Annotated[List[Any], _bounded_append]
+    last_action: NotRequired[Optional[str]]  # FIX: Add this to preserve action between nodes
+    last_action_input: NotRequired[Optional[str]]  # FIX: Add this too
     
     # Tool results
-    tool_results: Dict[str, Any]
+    tool_results: NotRequired[Dict[str, Any]]
+    tool_context: NotRequired[str]  # tool_results rendered for prompts, refreshed on each new result
+    policy_context: NotRequired[List[Dict[str, Any]]]  # Prefetched during planning
+    repeated_tool_hits: NotRequired[int]  # Consecutive tool calls answered from tool_results
     
     # Reflection
-    contradictions_found: List[str]
-    assumptions: List[str]
-    confidence_score: float
+    contradictions_found: NotRequired[List[str]]
+    assumptions: NotRequired[List[str]]
+    confidence_score: NotRequired[float]
     
     # Final output
-    final_answer: Optional[str]
+    final_answer: NotRequired[Optional[str]]
     should_continue: bool
 
 
+# Outermost {...} span of an LLM reply (tolerates ```json fences and chatter)
+_JSON_RE = re.compile(rb"\{.*\}", re.S)
+
+
+def _extract_json(text: str) -> Dict[str, Any]:
+    """Parse the JSON object embedded in an LLM response"""
+    match = _JSON_RE.search(text.encode("utf-8"))
+    if not match:
+        raise ValueError("No JSON object found in response")
+    parsed = orjson.loads(match.group(0))
+    if not isinstance(parsed, dict):
+        raise ValueError("Response JSON is not an object")
+    return parsed
+
+
+# ACTION: tool_name("arg") - name and raw argument text in one scan
+_ACTION_RE = re.compile(r"ACTION:\s*(\w+)\s*(?:\((.*?)\))?")
+
+
+def _dumps(obj: Any) -> str:
+    """Compact JSON for prompt context (no indentation - whitespace costs tokens)"""
+    return orjson.dumps(obj).decode("utf-8")
+
+
+def _summarize_tools(results: Dict[str, Any], keep_last: int = 3, max_chars: int = 2000) -> str:
+    """
+    Render tool results for a prompt within a fixed budget
+    
+    The last `keep_last` results are kept verbatim, older ones are cut to a
+    120-char preview, and the whole block is capped at `max_chars` (oldest text
+    dropped first). Prompt size stays flat as the ReAct loop iterates.
+    """
+    items = list(results.items())
+    older, recent = items[:-keep_last], items[-keep_last:]
+    
+    lines = []
+    for key, value in older:
+        text = str(value).replace("\n", " ")
+        lines.append(f"{key}: {text[:120]}..." if len(text) > 120 else f"{key}: {text}")
+    lines.extend(f"{key}: {value}" for key, value in recent)
+    
+    summary = "\n".join(lines)
+    if len(summary) > max_chars:
+        summary = "..." + summary[-max_chars:]
+    return summary
+
+
+# Message markers. Plain ASCII: emoji cost several tokens each and these
+# markers are repeated in every prompt that carries the message history.
+_TAGS = {
+    "plan": "[PLAN]",
+    "reflect": "[REFLECTION]",
+    "ok": "[OK]",
+    "warn": "[WARN]",
+    "err": "[ERR]",
+}
+
+
+# Fast-path planner: (pattern, intent, tool) for single-lookup queries that
+# don't need an LLM to plan. Each intent has both word orders.
+_INTENT_PATTERNS = [
+    (re.compile(r"\border\s*#?\s*(?P<id>\d+)\b.*\b(?:status|where|track|tracking|arrive|shipped)\b", re.I | re.S),
+     "order_status", "get_order_status"),
+    (re.compile(r"\b(?:status|where|track|tracking)\b.*\border\s*#?\s*(?P<id>\d+)\b", re.I | re.S),
+     "order_status", "get_order_status"),
+    (re.compile(r"\brefund\b.*\border\s*#?\s*(?P<id>\d+)\b", re.I | re.S),
+     "refund_status", "get_refund_status"),
+    (re.compile(r"\border\s*#?\s*(?P<id>\d+)\b.*\brefund\b", re.I | re.S),
+     "refund_status", "get_refund_status"),
+    (re.compile(r"\b(?P<id>P\d+)\b.*\b(?:in stock|stock|available|inventory)\b", re.I | re.S),
+     "inventory_check", "get_inventory"),
+    (re.compile(r"\b(?:in stock|stock|available|inventory)\b.*\b(?P<id>P\d+)\b", re.I | re.S),
+     "inventory_check", "get_inventory"),
+]
+
+# A refund query names its order too ("refund status for order 54321"): when
+# both match the same ID, the more specific intent is still one lookup
+_INTENT_SUBSUMES = {"refund_status": "order_status"}
+
+# Conjunctions / other-intent keywords: the query may need more than one lookup
+_COMPOUND_RE = re.compile(r"\b(?:and|also|but|delay\w*|late|charg\w*|fee|cancel\w*|return\w*|damage\w*)\b", re.I)
+
+
+def _route_intent(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Plan a query without the LLM when it is an unambiguous single lookup
+    
+    Returns a plan in the planner's JSON shape, or None when no pattern - or
+    patterns for more than one distinct lookup - match (the LLM planner handles those).
+    """
+    if _COMPOUND_RE.search(query):
+        return None
+    
+    matches = {}
+    for pattern, intent, tool in _INTENT_PATTERNS:
+        match = pattern.search(query)
+        if match:
+            # Product IDs are upper-case in the catalog ("p123" -> "P123")
+            matches.setdefault(intent, (tool, match.group('id').upper()))
+    
+    for specific, general in _INTENT_SUBSUMES.items():
+        if specific in matches and general in matches and matches[specific][1] == matches[general][1]:
+            del matches[general]
+    
+    if len(matches) != 1:
+        return None
+    
+    (intent, (tool, arg)), = matches.items()
+    return {
+        "identified_intents": [intent],
+        "missing_information": [],
+        "planned_steps": [f"{tool}({arg})"],
+        "parallel_tools": [{"name": tool, "input": arg}],
+        "requires_clarification": False,
+        "confidence": 0.8
+    }
+
+
+# System prompts are built once at import. Keeping them byte-identical across
+# calls (all dynamic context lives in the HumanMessage) lets the provider reuse
+# its prompt-prefix cache.
+_PLAN_SYS = SystemMessage(content="""You are an expert planning assistant for e-commerce customer service.
+Analyze the query and create a structured plan.
+
+Respond ONLY with valid JSON:
+{
+  "identified_intents": ["intent1", "intent2"],
+  "missing_information": ["field1", "field2"],
+  "planned_steps": ["step1", "step2"],
+  "parallel_tools": [{"name": "get_order_status", "input": "98762"}],
+  "requires_clarification": false,
+  "confidence": 0.9
+}
+
+parallel_tools: tool calls whose inputs are already known from the query and that
+don't depend on each other - they run together before the first reasoning step.
+Use [] if none.
+
+Available intents: order_status, refund_status, delivery_delay, inventory_check, extra_charges, return_policy, cancellation
+Available tools: get_order_status, get_orders_batch, get_refund_status, get_inventory, get_inventory_bulk, get_user_orders
+For two or more order IDs use one get_orders_batch call with input "id1, id2" instead of several get_order_status calls
+(likewise get_inventory_bulk for several product IDs).""")
+
+_THINK_SYS = SystemMessage(content="""You are a ReAct agent. Think step-by-step about what to do next.
+
+Based on the current state:
+1. What information do we have?
+2. What information is missing?
+3. What's the next logical action?
+
+Respond with your thought process and the next action in this format:
+THOUGHT: [Your reasoning]
+ACTION: [tool_name]([arguments])
+
+Available actions:
+- get_order_status(order_id): Get order details
+- get_orders_batch("order_id1, order_id2"): Get several orders in one call (use instead of repeated get_order_status)
+- get_refund_status(order_id): Check refund status  
+- get_inventory(product_id): Check inventory
+- get_inventory_bulk("product_id1, product_id2"): Check several products in one call
+- get_user_orders(user_id): Get recent orders
+- retrieve_policy(query): Get relevant policies
+- FINISH: Generate final answer
+
+Example:
+THOUGHT: The user asked about order #98762 status. I need to fetch the order details first.
+ACTION: get_order_status("98762")""")
+
+_REFLECT_SYS = SystemMessage(content="""You are a critical thinking assistant. Analyze the agent's progress.
+
+Check for:
+1. Contradictions between tool outputs
+2. Weak assumptions
+3. Missing critical information
+4. Policy conflicts
+
+Respond with JSON:
+{
+  "contradictions": ["contradiction1", "contradiction2"],
+  "assumptions": ["assumption1"],
+  "confidence": 0.8,
+  "should_revise_plan": false,
+  "reasoning": "explanation",
+  "next_steps": ["step1", "step2"]
+}""")
+
+_ANSWER_SYS = SystemMessage(content="""You are a customer service AI assistant. Generate a concise response in 3-4 sentences maximum.
+
+Format: [What we found] + [Why/Policy explanation] + [What to do next]
+
+RULES:
+- Be direct and brief - no lengthy sections
+- Ground response in tool data and policies
+- State uncertainty briefly if present
+- Provide one clear action
+
+Example: "Your order #98762 is out for delivery, delayed 3 days beyond the Dec 24 expected date. Under our delivery delay policy (Section 3), delays exceeding 48 hours qualify for 5% compensation. You can claim this through your account dashboard, or wait for delivery which tracking shows arriving within 24 hours."
+""")
+
+
+# Agent executing the current graph run. Each run is its own asyncio task, so
+# concurrent runs on the agent loop (run_many) each see their own agent
+_CURRENT_AGENT: contextvars.ContextVar["ReActAgent"] = contextvars.ContextVar("current_agent")
+
+
+def _dispatch_node(name: str):
+    """Graph node that forwards to the named method of the current agent"""
+    async def node(state: AgentState) -> Dict[str, Any]:
+        return await getattr(_CURRENT_AGENT.get(), name)(state)
+    node.__name__ = name
+    return node
+
+
+def _dispatch_edge(name: str):
+    """Conditional-edge router that forwards to the named method of the current agent"""
+    def edge(state: AgentState) -> str:
+        return getattr(_CURRENT_AGENT.get(), name)(state)
+    edge.__name__ = name
+    return edge
+
+
 class ReActAgent:
     """
     LangGraph-based ReAct Agent for E-Commerce Order Resolution
@@ -68,78 +314,187 @@ class ReActAgent:
     - Policy-grounded responses via RAG
     """
     
+    # Compiled once per process (see _compiled_graph)
+    _COMPILED_GRAPH = None
+    
     def __init__(self):
         if not config.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not found. Please set it in .env file")
         
-        # Initialize LLM
-        self.llm = ChatGroq(
+        # Async checkpointers bind to the event loop they were created on, so the
+        # agent runs its graph on a dedicated loop thread; run()/arun() submit to it
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="agent-loop", daemon=True)
+        self._loop_thread.start()
+        
+        # LLM, retriever, checkpointer and graph are built on first use (see warm_up)
+        self._init_lock = threading.Lock()
+        self._ready = False  # Set once warm_up has built everything
+    
+    @cached_property
+    def llm(self) -> ChatGroq:
+        """Groq chat model"""
+        return ChatGroq(
             groq_api_key=config.GROQ_API_KEY,
             model_name=config.MODEL_NAME,
             temperature=0.3,
             max_tokens=2000
         )
+    
+    @cached_property
+    def retriever(self) -> PolicyRetriever:
+        """Policy retriever with policies loaded (embedding model + vector index)"""
+        retriever = PolicyRetriever()
+        retriever.load_policies()
+        return retriever
+    
+    @cached_property
+    def cached_llm(self):
+        """Semantic response cache in front of the LLM (reuses the retriever's embedder)"""
+        if config.ENABLE_LLM_CACHE:
+            return SemanticLLMCache(self.llm, self.retriever.embedding_model)
+        return self.llm
+    
+    @cached_property
+    def memory(self):
+        """Checkpointer for conversation history (persistent by default)"""
+        return self._submit(self._create_checkpointer()).result()
+    
+    @cached_property
+    def graph(self):
+        """Shared compiled graph, bound to this agent's checkpointer for conversation history"""
+        graph = copy.copy(self._compiled_graph())
+        graph.checkpointer = self.memory
+        return graph
+    
+    def warm_up(self):
+        """
+        Build the lazy components a run needs
+        
+        Call it up front to move model/index loading out of the first query.
+        The entry points also call it before work is submitted to the agent loop:
+        creating the checkpointer blocks on that loop, and loading the retriever
+        there would stall every run in flight.
+        """
+        if self._ready:
+            return
+        with self._init_lock:
+            self.graph
+            self.retriever  # Not built by cached_llm when the LLM cache is off
+            self.cached_llm
+            get_simulator()  # Tools read it from the agent loop
+            self._ready = True
+        
+    def _submit(self, coro):
+        """Schedule a coroutine on the agent's loop (thread-safe, returns a concurrent Future)"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+    
+    async def _create_checkpointer(self):
+        """
+        Create the conversation checkpointer selected by config.CHECKPOINTER_BACKEND
         
-        # Initialize retriever
-        self.retriever = PolicyRetriever()
-        self.retriever.load_policies()
+        - sqlite: single-file store at CHECKPOINT_DSN (default)
+        - postgres: shared store for multi-worker deployments (pooled connections)
+        - memory: in-process only, lost on restart
+        """
+        backend = config.CHECKPOINTER_BACKEND
+        
+        if backend == "sqlite":
+            # The connection runs a worker thread: callers must close() the agent
+            conn = await aiosqlite.connect(config.CHECKPOINT_DSN)
+            checkpointer = AsyncSqliteSaver(conn)
+            await checkpointer.setup()
+            return checkpointer
         
-        # Initialize memory for conversation history
-        self.memory = MemorySaver()
+        if backend == "postgres":
+            from psycopg_pool import AsyncConnectionPool
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            
+            pool = AsyncConnectionPool(
+                conninfo=config.CHECKPOINT_DSN,
+                max_size=config.CHECKPOINT_POOL_SIZE,
+                kwargs={"autocommit": True, "prepare_threshold": 0},
+                open=False
+            )
+            await pool.open()
+            checkpointer = AsyncPostgresSaver(pool)
+            await checkpointer.setup()
+            return checkpointer
         
-        # Build graph
-        self.graph = self._build_graph()
+        if backend == "memory":
+            return MemorySaver()
         
-    def _build_graph(self) -> StateGraph:
+        raise ValueError(f"Unknown CHECKPOINTER_BACKEND: {backend}")
+    
+    @classmethod
+    def _compiled_graph(cls):
+        """Compile the graph once per process; every agent shares the result"""
+        if ReActAgent._COMPILED_GRAPH is None:
+            ReActAgent._COMPILED_GRAPH = cls._build_graph()
+        return ReActAgent._COMPILED_GRAPH
+    
+    @staticmethod
+    def _build_graph():
         """
         Build the LangGraph state graph for ReAct agent
         
         Graph Flow:
         START → plan → think → act → observe → reflect → decide → [continue or finish]
+        (plan → parallel_act → reflect when the planner lists independent tool calls)
+        
+        Nodes and routers are looked up on the agent executing the current run
+        (_CURRENT_AGENT), so the compiled graph holds no reference to an instance.
         """
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("plan", self._plan_node)
-        workflow.add_node("think", self._think_node)
-        workflow.add_node("act", self._act_node)
-        workflow.add_node("observe", self._observe_node)
-        workflow.add_node("reflect", self._reflect_node)
-        workflow.add_node("answer", self._answer_node)
+        workflow.add_node("plan", _dispatch_node("_plan_node"))
+        workflow.add_node("think", _dispatch_node("_think_node"))
+        workflow.add_node("act", _dispatch_node("_act_node"))
+        workflow.add_node("parallel_act", _dispatch_node("_parallel_act_node"))
+        workflow.add_node("observe", _dispatch_node("_observe_node"))
+        workflow.add_node("reflect", _dispatch_node("_reflect_node"))
+        workflow.add_node("answer", _dispatch_node("_answer_node"))
         
         # Define edges
         workflow.set_entry_point("plan")
         
-        # Plan → Think (or Answer if clarification needed)
+        # Plan → Think (or Answer if clarification needed, or Parallel Act if the
+        # planner listed independent tool calls)
         workflow.add_conditional_edges(
             "plan",
-            self._should_clarify,
+            _dispatch_edge("_should_clarify"),
             {
                 "clarify": "answer",
+                "parallel": "parallel_act",
                 "continue": "think"
             }
         )
         
+        # Parallel Act → Reflect
+        workflow.add_edge("parallel_act", "reflect")
+        
         # Think → Act
         workflow.add_edge("think", "act")
         
         # Act → Observe
         workflow.add_edge("act", "observe")
         
-        # Observe → Reflect (every 2 iterations or on errors)
+        # Observe → Reflect (every 2 iterations or on errors), or Answer if looping
         workflow.add_conditional_edges(
             "observe",
-            self._should_reflect,
+            _dispatch_edge("_should_reflect"),
             {
                 "reflect": "reflect",
-                "continue": "think"
+                "continue": "think",
+                "finish": "answer"
             }
         )
         
         # Reflect → Think (re-plan) or Answer (finish)
         workflow.add_conditional_edges(
             "reflect",
-            self._should_continue,
+            _dispatch_edge("_should_continue"),
             {
                 "continue": "think",
                 "finish": "answer"
@@ -149,29 +504,20 @@ class ReActAgent:
         # Answer → END
         workflow.add_edge("answer", END)
         
-        # Compile with memory checkpointer for conversation history
-        return workflow.compile(checkpointer=self.memory)
+        # Compiled without a checkpointer - each agent attaches its own
+        return workflow.compile()
     
     # ========== NODE IMPLEMENTATIONS ==========
     
-    def _plan_node(self, state: AgentState) -> AgentState:
+    async def _plan_node(self, state: AgentState) -> Dict[str, Any]:
         """
         Initial planning: Identify intents, missing info, and create execution plan
+        
+        Simple single-lookup queries are planned by _route_intent without an LLM
+        call. Otherwise policy retrieval runs concurrently with the planner LLM
+        call, so the answer node never waits on embedding + vector search.
         """
-        system_prompt = """You are an expert planning assistant for e-commerce customer service.
-Analyze the query and create a structured plan.
-
-Respond ONLY with valid JSON:
-{
-  "identified_intents": ["intent1", "intent2"],
-  "missing_information": ["field1", "field2"],
-  "planned_steps": ["step1", "step2"],
-  "requires_clarification": false,
-  "confidence": 0.9
-}
-
-Available intents: order_status, refund_status, delivery_delay, inventory_check, extra_charges, return_policy, cancellation
-Available tools: get_order_status, get_refund_status, get_inventory, get_user_orders"""
+        fast_plan = _route_intent(state["query"])
 
         user_prompt = f"""Query: "{state['query']}"
 User ID: {state['user_id']}
@@ -179,94 +525,87 @@ User ID: {state['user_id']}
 Create execution plan."""
 
         messages = [
-            SystemMessage(content=system_prompt),
+            _PLAN_SYS,
             HumanMessage(content=user_prompt)
         ]
         
-        response = self.llm.invoke(messages)
+        if fast_plan is not None:
+            policies = await asyncio.to_thread(self.retriever.retrieve, state["query"], top_k=3)
+        else:
+            response, policies = await asyncio.gather(
+                self.cached_llm.ainvoke(messages),
+                asyncio.to_thread(self.retriever.retrieve, state["query"], top_k=3)
+            )
+        
+        # Reset per-run execution state (also needed by the fallback plan)
+        update = {
+            "policy_context": policies,
+            "current_step": 0,
+            "iteration_count": 0,
+            "tool_results": {},
+            "tool_context": "",
+            "repeated_tool_hits": 0,
+            "contradictions_found": [],
+            "assumptions": [],
+            "should_continue": True
+        }
         
         # Parse plan
         try:
-            plan_text = response.content.strip()
-            if "```json" in plan_text:
-                plan_text = plan_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in plan_text:
-                plan_text = plan_text.split("```")[1].split("```")[0].strip()
-            
-            plan = json.loads(plan_text)
+            plan = fast_plan or _extract_json(response.content)
+            parallel_tools = plan.get("parallel_tools") or []
+            if not isinstance(parallel_tools, list):
+                raise ValueError("parallel_tools is not a list")
             
-            state["identified_intents"] = plan.get("identified_intents", [])
-            state["missing_information"] = plan.get("missing_information", [])
-            state["planned_steps"] = plan.get("planned_steps", [])
-            state["requires_clarification"] = plan.get("requires_clarification", False)
-            state["confidence_score"] = plan.get("confidence", 0.5)
-            state["current_step"] = 0
-            state["iteration_count"] = 0
-            state["tool_results"] = {}
-            state["contradictions_found"] = []
-            state["assumptions"] = []
-            state["should_continue"] = True
+            update["identified_intents"] = plan.get("identified_intents", [])
+            update["missing_information"] = plan.get("missing_information", [])
+            update["planned_steps"] = plan.get("planned_steps", [])
+            update["parallel_tools"] = [
+                {"name": str(tool["name"]), "input": str(tool.get("input", ""))}
+                for tool in parallel_tools
+                if isinstance(tool, dict) and tool.get("name")
+            ]
+            update["requires_clarification"] = plan.get("requires_clarification", False)
+            update["confidence_score"] = plan.get("confidence", 0.5)
             
-            state["messages"] = [
-                HumanMessage(content=f"📋 PLAN:\n{json.dumps(plan, indent=2)}")
+            update["messages"] = [
+                HumanMessage(content=f"{_TAGS['plan']}:\n{_dumps(plan)}")
             ]
             
-        except Exception as e:
+        except ValueError as e:
             # Fallback plan
-            state["identified_intents"] = ["general_inquiry"]
-            state["missing_information"] = []
-            state["planned_steps"] = ["Analyze query", "Retrieve policies", "Respond"]
-            state["requires_clarification"] = False
-            state["confidence_score"] = 0.3
-            state["messages"] = [HumanMessage(content=f"⚠️ Planning error: {str(e)}")]
+            update["identified_intents"] = ["general_inquiry"]
+            update["missing_information"] = []
+            update["planned_steps"] = ["Analyze query", "Retrieve policies", "Respond"]
+            update["parallel_tools"] = []
+            update["requires_clarification"] = False
+            update["confidence_score"] = 0.3
+            update["messages"] = [HumanMessage(content=f"{_TAGS['warn']} Planning error: {str(e)}")]
         
-        return state
+        return update
     
-    def _think_node(self, state: AgentState) -> AgentState:
+    async def _think_node(self, state: AgentState) -> Dict[str, Any]:
         """
         Reasoning step: Decide next action based on current state
         """
         # Build context from previous steps
         context = self._build_context(state)
         
-        system_prompt = """You are a ReAct agent. Think step-by-step about what to do next.
-
-Based on the current state:
-1. What information do we have?
-2. What information is missing?
-3. What's the next logical action?
-
-Respond with your thought process and the next action in this format:
-THOUGHT: [Your reasoning]
-ACTION: [tool_name]([arguments])
-
-Available actions:
-- get_order_status(order_id): Get order details
-- get_refund_status(order_id): Check refund status  
-- get_inventory(product_id): Check inventory
-- get_user_orders(user_id): Get recent orders
-- retrieve_policy(query): Get relevant policies
-- FINISH: Generate final answer
-
-Example:
-THOUGHT: The user asked about order #98762 status. I need to fetch the order details first.
-ACTION: get_order_status("98762")"""
-
         messages = [
-            SystemMessage(content=system_prompt),
+            _THINK_SYS,
             HumanMessage(content=context)
         ]
         
-        response = self.llm.invoke(messages)
+        response = await self.cached_llm.ainvoke(messages)
         thought_content = response.content.strip()
         
         # Store thought silently
-        state["messages"] = [AIMessage(content=thought_content)]
-        state["iteration_count"] += 1
-        
-        return state
+        return {
+            "messages": [AIMessage(content=thought_content)],
+            "iteration_count": state["iteration_count"] + 1
+        }
     
-    def _act_node(self, state: AgentState) -> AgentState:
+    async def _act_node(self, state: AgentState) -> Dict[str, Any]:
         """
         Action step: Execute the planned tool/action
         """
@@ -276,151 +615,162 @@ ACTION: get_order_status("98762")"""
         # Parse action
         action, action_input = self._parse_action(last_message)
         
+        update = {}
         if not action or action == "None":
             # Force FINISH if parsing failed
             action = "FINISH"
             action_input = ""
-            state["should_continue"] = False
+            update["should_continue"] = False
         
         # Store action silently
-        state["last_action"] = action
-        state["last_action_input"] = action_input
-        state["messages"] = [AIMessage(content=f"{action}({action_input})")]
+        update["last_action"] = action
+        update["last_action_input"] = action_input
+        update["messages"] = [AIMessage(content=f"{action}({action_input})")]
         
-        return state
+        return update
     
-    def _observe_node(self, state: AgentState) -> AgentState:
+    async def _observe_node(self, state: AgentState) -> Dict[str, Any]:
         """
         Observation step: Execute tool and capture results
         """
         action = state.get("last_action")
         action_input = state.get("last_action_input", "")
         
+        update = {}
         if action == "FINISH":
-            state["should_continue"] = False
+            update["should_continue"] = False
             observation = "Ready to generate final answer"
         else:
-            # Execute tool
-            observation = self._execute_tool(action, action_input, state)
-            
-            # Store result
-            state["tool_results"][f"{action}_{action_input}"] = observation
+            key = f"{action}_{action_input}"
+            cached = state["tool_results"].get(key)
+            if cached is not None and not cached.startswith(_TAGS["err"]):
+                # Same call already succeeded this run - reuse it instead of re-running the tool
+                observation = cached
+                update["repeated_tool_hits"] = state.get("repeated_tool_hits", 0) + 1
+            else:
+                observation = await self._execute_tool(action, action_input, state)
+                
+                # Store result (new dict - channel values are never mutated in place) and
+                # render the prompt block once here instead of in every context builder
+                tool_results = {**state["tool_results"], key: observation}
+                update["tool_results"] = tool_results
+                update["tool_context"] = _summarize_tools(tool_results)
+                update["repeated_tool_hits"] = 0
         
         # Store observation silently
-        state["messages"] = [AIMessage(content=observation)]
+        update["messages"] = [AIMessage(content=observation)]
+        
+        return update
+    
+    async def _parallel_act_node(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Execute the planner's independent tool calls concurrently
+        
+        Replaces one think → act → observe round per tool; results land in
+        tool_results exactly as if observed one by one.
+        """
+        calls = {f"{t['name']}_{t['input']}": t for t in state["parallel_tools"]}
+        observations = await asyncio.gather(*[
+            self._execute_tool(t["name"], t["input"], state)
+            for t in calls.values()
+        ])
         
-        return state
+        tool_results = {**state["tool_results"], **dict(zip(calls, observations))}
+        messages = []
+        for t, observation in zip(calls.values(), observations):
+            messages.append(AIMessage(content=f"{t['name']}({t['input']})"))
+            messages.append(AIMessage(content=observation))
+        
+        return {
+            "tool_results": tool_results,
+            "tool_context": _summarize_tools(tool_results),
+            "last_action": "parallel_tools",
+            "last_action_input": "",
+            "messages": messages
+        }
     
-    def _reflect_node(self, state: AgentState) -> AgentState:
+    async def _reflect_node(self, state: AgentState) -> Dict[str, Any]:
         """
         Reflection step: Analyze results, detect contradictions, decide if re-planning needed
         """
         context = self._build_reflection_context(state)
         
-        system_prompt = """You are a critical thinking assistant. Analyze the agent's progress.
-
-Check for:
-1. Contradictions between tool outputs
-2. Weak assumptions
-3. Missing critical information
-4. Policy conflicts
-
-Respond with JSON:
-{
-  "contradictions": ["contradiction1", "contradiction2"],
-  "assumptions": ["assumption1"],
-  "confidence": 0.8,
-  "should_revise_plan": false,
-  "reasoning": "explanation",
-  "next_steps": ["step1", "step2"]
-}"""
-
         messages = [
-            SystemMessage(content=system_prompt),
+            _REFLECT_SYS,
             HumanMessage(content=context)
         ]
         
-        response = self.llm.invoke(messages)
+        response = await self.cached_llm.ainvoke(messages)
         
         try:
-            reflection_text = response.content.strip()
-            if "```json" in reflection_text:
-                reflection_text = reflection_text.split("```json")[1].split("```")[0].strip()
+            reflection = _extract_json(response.content)
             
-            reflection = json.loads(reflection_text)
-            
-            state["contradictions_found"] = reflection.get("contradictions", [])
-            state["assumptions"] = reflection.get("assumptions", [])
-            state["confidence_score"] = reflection.get("confidence", state["confidence_score"])
+            update = {
+                "contradictions_found": reflection.get("contradictions", []),
+                "assumptions": reflection.get("assumptions", []),
+                "confidence_score": reflection.get("confidence", state["confidence_score"])
+            }
             
             # Update plan if needed
             if reflection.get("should_revise_plan"):
-                state["planned_steps"] = reflection.get("next_steps", state["planned_steps"])
+                update["planned_steps"] = reflection.get("next_steps", state["planned_steps"])
             
-            state["messages"] = [
-                AIMessage(content=f"🔍 REFLECTION:\n{reflection.get('reasoning', '')}")
+            update["messages"] = [
+                AIMessage(content=f"{_TAGS['reflect']}:\n{reflection.get('reasoning', '')}")
             ]
             
             # Decide if we should finish
             if state["iteration_count"] >= config.MAX_ITERATIONS:
-                state["should_continue"] = False
+                update["should_continue"] = False
             elif reflection.get("confidence", 0) > 0.85 and not reflection.get("contradictions"):
-                state["should_continue"] = False
+                update["should_continue"] = False
                 
-        except Exception as e:
-            state["messages"] = [AIMessage(content=f"⚠️ Reflection error: {str(e)}")]
+        except ValueError as e:
+            update = {"messages": [AIMessage(content=f"{_TAGS['warn']} Reflection error: {str(e)}")]}
         
-        return state
+        return update
     
-    def _answer_node(self, state: AgentState) -> AgentState:
+    async def _answer_node(self, state: AgentState) -> Dict[str, Any]:
         """
         Final answer generation: Create user-safe, policy-grounded response
         """
         # Handle clarification request
         if state.get("requires_clarification") and state.get("missing_information"):
             clarification = self._generate_clarification(state)
-            state["final_answer"] = clarification
-            return state
+            return {"final_answer": clarification}
         
-        # Retrieve relevant policies
-        policy_context = self.retriever.retrieve(state["query"], top_k=3)
+        # Use policies prefetched during planning; retrieve only if missing
+        policy_context = state.get("policy_context")
+        if policy_context is None:
+            policy_context = await asyncio.to_thread(self.retriever.retrieve, state["query"], top_k=3)
         
         # Build comprehensive context
         context = self._build_final_context(state, policy_context)
         
-        system_prompt = """You are a customer service AI assistant. Generate a concise response in 3-4 sentences maximum.
-
-Format: [What we found] + [Why/Policy explanation] + [What to do next]
-
-RULES:
-- Be direct and brief - no lengthy sections
-- Ground response in tool data and policies
-- State uncertainty briefly if present
-- Provide one clear action
-
-Example: "Your order #98762 is out for delivery, delayed 3 days beyond the Dec 24 expected date. Under our delivery delay policy (Section 3), delays exceeding 48 hours qualify for 5% compensation. You can claim this through your account dashboard, or wait for delivery which tracking shows arriving within 24 hours."
-"""
-
         messages = [
-            SystemMessage(content=system_prompt),
+            _ANSWER_SYS,
             HumanMessage(content=context)
         ]
         
-        response = self.llm.invoke(messages)
-        state["final_answer"] = response.content.strip()
-        
-        return state
+        response = await self.cached_llm.ainvoke(messages)
+        return {"final_answer": response.content.strip()}
     
     # ========== CONDITIONAL EDGE FUNCTIONS ==========
     
     def _should_clarify(self, state: AgentState) -> str:
-        """Decide if clarification is needed"""
+        """Decide if clarification is needed, or if planned tool calls can run in parallel"""
         if state.get("requires_clarification") and state.get("missing_information"):
             return "clarify"
+        if state.get("parallel_tools"):
+            return "parallel"
         return "continue"
     
     def _should_reflect(self, state: AgentState) -> str:
         """Decide if reflection is needed - reduced frequency for efficiency"""
+        # The model keeps re-requesting data it already has - answer with what we've got
+        if state.get("repeated_tool_hits", 0) >= 2:
+            return "finish"
+        
         # Skip reflection if we just got good data
         last_obs = state["messages"][-1].content if state["messages"] else ""
         if "Success:" in last_obs and state.get("last_action") != "FINISH":
@@ -478,61 +828,47 @@ Example: "Your order #98762 is out for delivery, delayed 3 days beyond the Dec 2
     
     def _parse_action(self, thought: str) -> tuple[Optional[str], str]:
         """Extract action and input from thought"""
-        if "ACTION:" not in thought:
-            # Try to trigger FINISH if we've done enough iterations
-            return "FINISH", ""
-        
-        action_line = thought.split("ACTION:")[1].strip().split("\n")[0]
+        match = _ACTION_RE.search(thought)
         
-        if "FINISH" in action_line:
+        # No parsable call (or an explicit FINISH) ends the loop
+        if not match or match.group(1) == "FINISH" or match.group(2) is None:
             return "FINISH", ""
         
-        # Parse function call
-        if "(" in action_line and ")" in action_line:
-            action_name = action_line.split("(")[0].strip()
-            # Handle both quoted and unquoted arguments
-            action_input = action_line.split("(")[1].split(")")[0].strip()
-            # Remove quotes if present
-            action_input = action_input.strip('"').strip("'")
-            
-            # Validate action name is not empty
-            if action_name and action_name != "":
-                return action_name, action_input
-        
-        # If we can't parse, finish
-        return "FINISH", ""
+        action_input = match.group(2).strip()
+        if len(action_input) >= 2 and action_input[0] == action_input[-1] and action_input[0] in "'\"":
+            action_input = action_input[1:-1].strip()
+        return match.group(1), action_input
     
-    def _execute_tool(self, tool_name: str, tool_input: str, state: AgentState) -> str:
-        """Execute a tool and return observation"""
+    async def _execute_tool(self, tool_name: str, tool_input: str, state: AgentState) -> str:
+        """
+        Execute a tool and return observation
+        
+        Tools run through their async variants, so simulated latency yields the
+        loop instead of holding a worker thread; concurrent calls overlap.
+        """
         try:
-            if tool_name == "get_order_status":
-                result = get_order_status(tool_input).to_dict()
-            elif tool_name == "get_refund_status":
-                result = get_refund_status(tool_input).to_dict()
-            elif tool_name == "get_inventory":
-                result = get_inventory(tool_input).to_dict()
-            elif tool_name == "get_user_orders":
-                result = get_user_orders(tool_input).to_dict()
-            elif tool_name == "retrieve_policy":
-                docs = self.retriever.retrieve(tool_input, top_k=2)
+            if tool_input[:1] in ("[", "{"):
+                # JSON list / object arguments: report it so the next step can retry
+                return (f"{_TAGS['err']} Error: {tool_name} takes a single string argument, "
+                        f"e.g. {tool_name}(\"98762\"), got {tool_input}")
+            if tool_name == "retrieve_policy":
+                docs = await asyncio.to_thread(self.retriever.retrieve, tool_input, top_k=2)
                 return f"Retrieved policies:\n{docs}"
+            elif tool_name in AVAILABLE_TOOLS:
+                response = await execute_tool_async(tool_name, tool_input)
             else:
-                return f"⚠️ Unknown tool: {tool_name}"
-            
-            # Format result
-            status = result.get("status", "unknown")
-            data = result.get("data", {})
-            error = result.get("error", "")
+                return f"{_TAGS['warn']} Unknown tool: {tool_name}"
             
-            if status == ToolStatus.SUCCESS.value:
-                return f"✅ Success:\n{json.dumps(data, indent=2)}"
-            elif status == ToolStatus.PARTIAL.value:
-                return f"⚠️ Partial data:\n{json.dumps(data, indent=2)}\nNote: Some fields may be missing"
+            # Format result (straight from the response; no to_dict round-trip)
+            if response.is_successful():
+                return f"{_TAGS['ok']} Success:\n{_dumps(response.data)}"
+            elif response.is_partial():
+                return f"{_TAGS['warn']} Partial data:\n{_dumps(response.data)}\nNote: Some fields may be missing"
             else:
-                return f"❌ Error: {error}"
+                return f"{_TAGS['err']} Error: {response.error}"
                 
         except Exception as e:
-            return f"❌ Tool execution error: {str(e)}"
+            return f"{_TAGS['err']} Tool execution error: {str(e)}"
     
     def _build_context(self, state: AgentState) -> str:
         """Build context for thinking step"""
@@ -546,7 +882,7 @@ Current Plan:
 Iteration: {state['iteration_count']}/{config.MAX_ITERATIONS}
 
 Tool Results:
-{json.dumps(state['tool_results'], indent=2) if state['tool_results'] else 'None yet'}
+{state.get('tool_context') or 'None yet'}
 
 What should we do next?"""
         return context
@@ -563,7 +899,7 @@ Recent Activity:
 {msg_text}
 
 Tool Results:
-{json.dumps(state['tool_results'], indent=2)}
+{state.get('tool_context', '')}
 
 Analyze for contradictions and confidence."""
     
@@ -574,7 +910,7 @@ Analyze for contradictions and confidence."""
 Identified Intents: {', '.join(state['identified_intents'])}
 
 Tool Results:
-{json.dumps(state['tool_results'], indent=2)}
+{state.get('tool_context', '')}
 
 Relevant Policies:
 {policies}
@@ -596,9 +932,9 @@ Could you please provide these details?"""
     
     # ========== PUBLIC API ==========
     
-    def run(self, query: str, user_id: str = "user_12345", thread_id: str = "default", verbose: bool = False, debug: bool = False) -> str:
+    async def arun(self, query: str, user_id: str = "user_12345", thread_id: str = "default", verbose: bool = False, debug: bool = False) -> str:
         """
-        Execute the agent on a query
+        Execute the agent on a query (async, awaitable from any event loop)
         
         Args:
             query: User's question/request
@@ -610,6 +946,50 @@ Could you please provide these details?"""
         Returns:
             Final answer
         """
+        if not self._ready:
+            await asyncio.to_thread(self.warm_up)
+        return await asyncio.wrap_future(
+            self._submit(self._execute(query, user_id, thread_id, verbose, debug))
+        )
+    
+    async def arun_stream(self, query: str, user_id: str = "user_12345", thread_id: str = "default") -> AsyncIterator[str]:
+        """
+        Execute the agent on a query, yielding the final answer as it is generated
+        
+        Planning and tool steps run as usual; tokens of the answer node's LLM call
+        are yielded as they arrive. If the answer is not generated token by token
+        (clarification request, LLM cache hit) it is yielded as a single chunk.
+        
+        Args:
+            query: User's question/request
+            user_id: User identifier
+            thread_id: Conversation thread ID (use same ID to continue conversation)
+        
+        Yields:
+            Answer text chunks
+        """
+        if not self._ready:
+            await asyncio.to_thread(self.warm_up)
+        
+        caller_loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        def emit(chunk: str):
+            caller_loop.call_soon_threadsafe(queue.put_nowait, chunk)
+        
+        future = self._submit(self._execute_stream(query, user_id, thread_id, emit))
+        future.add_done_callback(lambda _: caller_loop.call_soon_threadsafe(queue.put_nowait, done))
+        
+        try:
+            while (chunk := await queue.get()) is not done:
+                yield chunk
+            await asyncio.wrap_future(future)  # Re-raise errors from the run
+        finally:
+            future.cancel()  # Consumer stopped early - no-op if the run finished
+    
+    def _run_inputs(self, query: str, user_id: str, thread_id: str) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Initial state and run config for one graph execution"""
         initial_state = {
             "query": query,
             "user_id": user_id,
@@ -622,7 +1002,30 @@ Could you please provide these details?"""
             "configurable": {"thread_id": thread_id},
             "recursion_limit": 15  # Reduced from 50 for faster responses
         }
-        final_state = self.graph.invoke(initial_state, config)
+        return initial_state, config
+    
+    async def _execute_stream(self, query: str, user_id: str, thread_id: str, emit: Callable[[str], None]):
+        """Run the graph with event streaming, passing answer tokens to emit - on the agent's loop"""
+        initial_state, config = self._run_inputs(query, user_id, thread_id)
+        _CURRENT_AGENT.set(self)  # Scoped to this run's task
+        
+        streamed = False
+        async for event in self.graph.astream_events(initial_state, config, version="v2"):
+            if event["event"] == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "answer":
+                token = event["data"]["chunk"].content
+                if token:
+                    streamed = True
+                    emit(token)
+        
+        if not streamed:
+            final_state = await self.graph.aget_state(config)
+            emit(final_state.values.get("final_answer", "I apologize, but I encountered an issue processing your request."))
+    
+    async def _execute(self, query: str, user_id: str, thread_id: str, verbose: bool, debug: bool) -> str:
+        """Run the graph - always on the agent's own loop"""
+        initial_state, config = self._run_inputs(query, user_id, thread_id)
+        _CURRENT_AGENT.set(self)  # Scoped to this run's task
+        final_state = await self.graph.ainvoke(initial_state, config)
         
         if debug:
             print("\n" + "="*80)
@@ -639,6 +1042,83 @@ Could you please provide these details?"""
         
         return final_state.get("final_answer", "I apologize, but I encountered an issue processing your request.")
     
+    def run(self, query: str, user_id: str = "user_12345", thread_id: str = "default", verbose: bool = False, debug: bool = False) -> str:
+        """
+        Execute the agent on a query (blocking wrapper around arun)
+        
+        Args:
+            query: User's question/request
+            user_id: User identifier
+            thread_id: Conversation thread ID (use same ID to continue conversation)
+            verbose: Show brief execution summary (default: False)
+            debug: Show full execution trace (default: False)
+        
+        Returns:
+            Final answer
+        """
+        self.warm_up()
+        return self._submit(self._execute(query, user_id, thread_id, verbose, debug)).result()
+    
+    def close(self):
+        """Release checkpointer connections and stop the agent's event loop"""
+        if self._loop.is_closed():
+            return
+        
+        # aiosqlite connection (sqlite) or connection pool (postgres), if ever opened
+        conn = getattr(self.__dict__.get("memory"), "conn", None)
+        if conn is not None:
+            self._submit(conn.close()).result()
+        
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+    
+    async def run_many(self, queries: List[str], user_ids: Optional[List[str]] = None,
+                       max_concurrency: int = None, rpm: int = None,
+                       on_progress: Optional[Callable[[int, int], None]] = None) -> List[Union[str, Exception]]:
+        """
+        Execute many independent queries concurrently
+        
+        Each query runs in its own conversation thread. Concurrency is capped by a
+        semaphore and run starts are rate limited (token bucket) to stay under the
+        Groq requests-per-minute quota.
+        
+        Args:
+            queries: User questions to resolve
+            user_ids: Per-query user identifiers (default: config.DEFAULT_USER_ID)
+            max_concurrency: Maximum graph executions in flight
+            rpm: Maximum runs started per minute
+            on_progress: Called as on_progress(done, total) after each query finishes
+        
+        Returns:
+            Answers in input order; a failed query yields its exception instead
+        """
+        if user_ids is None:
+            user_ids = [config.DEFAULT_USER_ID] * len(queries)
+        if len(user_ids) != len(queries):
+            raise ValueError("user_ids must have the same length as queries")
+        
+        semaphore = asyncio.Semaphore(max_concurrency or config.BATCH_MAX_CONCURRENCY)
+        limiter = AsyncLimiter(rpm or config.BATCH_RUNS_PER_MINUTE, 60)
+        batch_id = uuid.uuid4().hex[:8]
+        total = len(queries)
+        done = 0
+        
+        async def run_one(i: int, query: str, user_id: str) -> str:
+            nonlocal done
+            try:
+                async with semaphore, limiter:
+                    return await self.arun(query, user_id=user_id, thread_id=f"batch_{batch_id}_{i}")
+            finally:
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+        
+        return await asyncio.gather(
+            *[run_one(i, q, uid) for i, (q, uid) in enumerate(zip(queries, user_ids))],
+            return_exceptions=True
+        )
+    
     def visualize(self, output_path: str = "agent_graph.png"):
         """
         Visualize the agent's graph structure
@@ -653,3 +1133,4 @@ Could you please provide these details?"""
             print(f"Visualization requires graphviz and IPython: {e}")
             print("\nGraph structure:")
             print("plan → [clarify check] → think → act → observe → [reflect check] → reflect → [continue check] → answer")
+            print("plan → parallel_act → reflect  (when the planner lists independent tool calls)")
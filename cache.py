@@ -0,0 +1,200 @@
+"""
+Semantic response cache for LLM calls
+Serves repeated / near-duplicate prompts without a Groq round-trip
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+
+import config
+
+
+# Numeric identifiers (order IDs, product IDs) must match exactly for a
+# semantic hit - "order 98762" and "order 98763" embed almost identically
+_IDENTIFIER_RE = re.compile(r"\d+")
+
+
+class CacheEntry:
+    """Cached completion with GDSF bookkeeping"""
+    def __init__(self, key: str, namespace: str, identifiers: str, content: str, cost: float):
+        self.key = key
+        self.namespace = namespace
+        self.identifiers = identifiers
+        self.content = content
+        self.cost = cost
+        self.frequency = 1
+        self.priority = 0.0
+
+
+class SemanticLLMCache:
+    """
+    Wraps a chat model and returns cached completions for similar prompts
+
+    Lookup:
+    - Exact hit on the hash of system prompt + conversation
+    - Semantic hit when cosine similarity >= threshold, within the same
+      system prompt and with identical numeric identifiers
+
+    Only the non-system messages are embedded: the system prompt is shared by
+    every entry in a namespace, so embedding it would only dilute the part of
+    the prompt that actually differs.
+
+    Eviction (GDSF): priority = clock + frequency * cost / size, where cost
+    is the measured LLM latency and size the cached response length. The
+    clock is raised to the evicted priority, so stale entries age out.
+    """
+
+    def __init__(self, llm: Any, embedding_model: Any, max_entries: int = None,
+                 similarity_threshold: float = None):
+        self.llm = llm
+        self.embedding_model = embedding_model
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES
+        self.similarity_threshold = similarity_threshold or config.CACHE_SIMILARITY_THRESHOLD
+
+        self.entries: List[Optional[CacheEntry]] = [None] * self.max_entries
+        self.embeddings: Optional[np.ndarray] = None  # (max_entries, dim), L2-normalized
+        self.by_key: Dict[str, int] = {}
+        self.clock = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages: List[BaseMessage]) -> AIMessage:
+        """Return a cached completion or call the LLM and cache the result"""
+        prompt, namespace = self._prompt_text(messages)
+        key = hashlib.sha256(f"{namespace}\n{prompt}".encode("utf-8")).hexdigest()
+        identifiers = " ".join(_IDENTIFIER_RE.findall(prompt))
+        embedding = self._embed(prompt)
+
+        cached = self._lookup(key, namespace, identifiers, embedding)
+        if cached is not None:
+            return AIMessage(content=cached)
+
+        start = time.perf_counter()
+        response = self.llm.invoke(messages)
+        self._insert(key, namespace, identifiers, embedding, response.content,
+                     time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, messages: List[BaseMessage]) -> AIMessage:
+        """Async variant of invoke - embedding runs in a worker thread"""
+        prompt, namespace = self._prompt_text(messages)
+        key = hashlib.sha256(f"{namespace}\n{prompt}".encode("utf-8")).hexdigest()
+        identifiers = " ".join(_IDENTIFIER_RE.findall(prompt))
+        embedding = await asyncio.to_thread(self._embed, prompt)
+
+        cached = self._lookup(key, namespace, identifiers, embedding)
+        if cached is not None:
+            return AIMessage(content=cached)
+
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages)
+        self._insert(key, namespace, identifiers, embedding, response.content,
+                     time.perf_counter() - start)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.by_key),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def clear(self):
+        """Drop all cached completions"""
+        with self.lock:
+            self.entries = [None] * self.max_entries
+            self.embeddings = None
+            self.by_key.clear()
+            self.clock = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        # Delegate everything else (model_name, bind, ...) to the wrapped LLM
+        return getattr(self.llm, name)
+
+    # ========== INTERNALS ==========
+
+    def _prompt_text(self, messages: List[BaseMessage]) -> tuple[str, str]:
+        """Split messages into the embedded text (non-system content) and the system prompt namespace"""
+        system = ""
+        rest = []
+        for message in messages:
+            if isinstance(message, SystemMessage):
+                system = message.content
+            else:
+                rest.append(message.content)
+
+        namespace = hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
+        return "\n".join(rest), namespace
+
+    def _embed(self, text: str) -> np.ndarray:
+        return self.embedding_model.encode(
+            text, convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32)
+
+    def _lookup(self, key: str, namespace: str, identifiers: str, embedding: np.ndarray) -> Optional[str]:
+        with self.lock:
+            slot = self.by_key.get(key)
+
+            if slot is None and self.embeddings is not None:
+                similarities = self.embeddings @ embedding
+                for candidate in np.argsort(similarities)[::-1]:
+                    if similarities[candidate] < self.similarity_threshold:
+                        break
+                    entry = self.entries[candidate]
+                    if entry and entry.namespace == namespace and entry.identifiers == identifiers:
+                        slot = int(candidate)
+                        break
+
+            if slot is None:
+                self.misses += 1
+                return None
+
+            entry = self.entries[slot]
+            entry.frequency += 1
+            entry.priority = self._priority(entry)
+            self.hits += 1
+            return entry.content
+
+    def _insert(self, key: str, namespace: str, identifiers: str, embedding: np.ndarray,
+                content: str, cost: float):
+        with self.lock:
+            if key in self.by_key:
+                return
+
+            if self.embeddings is None:
+                self.embeddings = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+            slot = self._free_slot()
+            entry = CacheEntry(key, namespace, identifiers, content, cost)
+            entry.priority = self._priority(entry)
+
+            self.entries[slot] = entry
+            self.embeddings[slot] = embedding
+            self.by_key[key] = slot
+
+    def _free_slot(self) -> int:
+        """Return an empty slot, evicting the lowest GDSF priority if full"""
+        if len(self.by_key) < self.max_entries:
+            return self.entries.index(None)
+
+        slot = min(range(self.max_entries), key=lambda i: self.entries[i].priority)
+        evicted = self.entries[slot]
+        self.clock = evicted.priority
+        del self.by_key[evicted.key]
+        self.entries[slot] = None
+        self.embeddings[slot] = 0.0
+        return slot
+
+    def _priority(self, entry: CacheEntry) -> float:
+        return self.clock + entry.frequency * entry.cost / max(len(entry.content), 1)
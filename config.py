@@ -22,10 +22,26 @@ REFLECTION_ON_ERROR = True  # Trigger reflection on tool errors
 VERBOSE = True  # Print agent's thoughts and actions
 ENABLE_GRAPH_VISUALIZATION = False  # Requires graphviz
 
+# Conversation Memory (LangGraph checkpointer)
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "sqlite")  # sqlite | postgres | memory
+CHECKPOINT_DSN = os.getenv("CHECKPOINT_DSN", "checkpoints.sqlite")  # SQLite path or Postgres conninfo
+CHECKPOINT_POOL_SIZE = 20  # Max pooled connections (postgres only)
+
+# Batch Execution (ReActAgent.run_many)
+BATCH_MAX_CONCURRENCY = 16  # Graph executions in flight
+BATCH_RUNS_PER_MINUTE = 300  # Rate limit on run starts (Groq RPM quota)
+
+# LLM Response Cache (semantic, see cache.py)
+ENABLE_LLM_CACHE = os.getenv("ENABLE_LLM_CACHE", "true").lower() == "true"
+CACHE_MAX_ENTRIES = 512  # Bounded number of cached completions
+CACHE_SIMILARITY_THRESHOLD = 0.95  # Cosine similarity required for a semantic hit
+
 # Tool Configuration
 TOOL_FAILURE_RATE = 0.2  # 20% chance of tool failure
 PARTIAL_DATA_RATE = 0.3  # 30% chance of partial/missing data
 SIMULATE_DELAYS = True  # Simulate API latency
+TOOL_CACHE_TTL = 10.0  # Seconds a successful catalog (inventory) response is reused (0 disables)
+TOOL_CACHE_MAX_ENTRIES = 256
 
 # RAG Configuration
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
@@ -33,6 +49,8 @@ TOP_K_POLICIES = 3  # Number of policy sections to retrieve
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 50
 POLICY_DIR = "policies"
+POLICY_CACHE_DIR = os.path.join(POLICY_DIR, ".cache")  # Persistent ChromaDB index
+QUERY_EMBEDDING_CACHE_SIZE = 256  # LRU of query embeddings (repeated retrieval queries skip the encoder)
 
 # User Session
 DEFAULT_USER_ID = "user_12345"  # For tracking user orders
@@ -5,6 +5,7 @@ Shows how orders progress through states in real-time
 
 import time
 from datetime import datetime
+from itertools import islice
 from order_simulator import get_simulator
 from tools import get_order_status, get_refund_status, get_user_orders
 
@@ -77,13 +78,13 @@ if user_response.is_successful():
     orders = user_response.data['orders']
     print(f"Found {user_response.data['count']} recent orders:\n")
     for order in orders:
-        print(f"  {order['order_id']}: {order['product_name']} - {order['current_state']}")
+        print(f"  {order['order_id']}: {order['product_name']} - {order['status']}")
 
 print_separator()
 
 # Step 4: Wait for simulator to progress orders
 print("STEP 4: Waiting for Simulator to Update States...")
-print("(Background thread runs every 5 seconds)")
+print("(Background thread wakes as transitions come due, at least every 5 seconds)")
 print("-" * 70)
 
 for countdown in range(6, 0, -1):
@@ -127,26 +128,21 @@ for order in all_orders[:3]:
 
 print_separator()
 
-# Step 7: Show the actual CSV file content
-print("STEP 7: Current CSV Database State")
+# Step 7: Show the current stored state
+print("STEP 7: Current Order Database State")
 print("-" * 70)
-print("(Check orders_db.csv to see persistent storage)\n")
-
-import csv
-with open('orders_db.csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    print(f"{'Order ID':<10} {'Product Name':<25} {'State':<15} {'Last Update':<20}")
-    print("-" * 70)
-    for i, row in enumerate(reader):
-        if i >= 5:  # Show first 5
-            break
-        print(f"{row['order_id']:<10} {row['product_name']:<25} {row['current_state']:<15} {row['last_update'][:19]:<20}")
+print("(Persisted to orders.db; orders_db.csv holds a readable snapshot)\n")
+
+print(f"{'Order ID':<10} {'Product Name':<25} {'State':<15} {'Last Update':<20}")
+print("-" * 70)
+for row in islice(simulator.orders.values(), 5):  # Show first 5
+    print(f"{row['order_id']:<10} {row['product_name']:<25} {row['current_state']:<15} {row['last_update'][:19]:<20}")
 
 print_separator()
 
 print("KEY TAKEAWAYS:")
 print("-" * 70)
-print("1. Orders are stored in CSV and updated by background thread")
+print("1. Orders are stored in SQLite (orders.db) and updated by background thread")
 print("2. States progress realistically (placed -> confirmed -> packed -> ...)")
 print("3. Refunds are dynamically generated based on order state")
 print("4. No hardcoded mock data - all responses come from simulator")
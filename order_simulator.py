@@ -1,17 +1,32 @@
 """
 Dynamic Order Lifecycle Simulator
-Simulates real-world e-commerce order progression with CSV persistence
+Simulates real-world e-commerce order progression with SQLite persistence
+
+orders.db (SQLite, WAL journal) is the durable store: each tick's state changes
+are written as row UPDATEs in one transaction. orders_db.csv is a human-readable
+snapshot refreshed periodically and on stop().
 """
 
 import csv
+import os
 import random
+import sqlite3
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Optional
 from enum import Enum
 import threading
 import time
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: without numba the tick runs on NumPy masks
+    njit = None
+    prange = range
+
 
 class OrderState(Enum):
     """Order lifecycle states"""
@@ -38,24 +53,121 @@ class DelayReason(Enum):
     NONE = "none"
 
 
+# State <-> column index for the vectorized tick. Enum order is the lifecycle:
+# PLACED..DELIVERED are consecutive, so progressing an order is index + 1.
+# Rows store the plain state strings; the enum stays at the public API.
+_STATES = tuple(state.value for state in OrderState)
+_STATE_INDEX = {state: i for i, state in enumerate(_STATES)}
+_LAST_PROGRESSABLE = _STATE_INDEX[OrderState.OUT_FOR_DELIVERY.value]
+_DELIVERED = _STATE_INDEX[OrderState.DELIVERED.value]
+_CANCELLED = _STATE_INDEX[OrderState.CANCELLED.value]
+_STUCK = _STATE_INDEX[OrderState.STUCK.value]
+_DELAY_REASONS = [reason.value for reason in DelayReason if reason is not DelayReason.NONE]
+
+
+def _advance_masks(state_idx, last_update_epoch, stuck, required_secs, now, draws,
+                   stuck_rate, cancel_rate):
+    """
+    Advance every due order in place (NumPy masks)
+    
+    draws[0] / draws[1] are the per-order uniform draws for the stuck and
+    cancel gates. Returns (changed, became_stuck) boolean masks.
+    """
+    eligible = (
+        (state_idx <= _LAST_PROGRESSABLE)
+        & ~stuck
+        & (now - last_update_epoch >= required_secs[state_idx])
+    )
+    stuck_mask = eligible & (draws[0] < stuck_rate)
+    cancel_mask = eligible & ~stuck_mask & (draws[1] < cancel_rate)
+    progress_mask = eligible & ~stuck_mask & ~cancel_mask
+    
+    state_idx[stuck_mask] = _STUCK
+    stuck[stuck_mask] = True
+    state_idx[cancel_mask] = _CANCELLED
+    state_idx[progress_mask] += 1
+    last_update_epoch[eligible] = now
+    return eligible, stuck_mask
+
+
+def _advance_loop(state_idx, last_update_epoch, stuck, required_secs, now, draws,
+                  stuck_rate, cancel_rate):
+    """Same contract as _advance_masks as one fused loop, compiled by numba"""
+    n = state_idx.shape[0]
+    changed = np.zeros(n, dtype=np.bool_)
+    became_stuck = np.zeros(n, dtype=np.bool_)
+    for i in prange(n):
+        state = state_idx[i]
+        if stuck[i] or state > _LAST_PROGRESSABLE or now - last_update_epoch[i] < required_secs[state]:
+            continue
+        changed[i] = True
+        if draws[0, i] < stuck_rate:
+            state_idx[i] = _STUCK
+            stuck[i] = True
+            became_stuck[i] = True
+        elif draws[1, i] < cancel_rate:
+            state_idx[i] = _CANCELLED
+        else:
+            state_idx[i] = state + 1
+        last_update_epoch[i] = now
+    return changed, became_stuck
+
+
+_advance = njit(cache=True, parallel=True)(_advance_loop) if njit else _advance_masks
+
+
 class OrderSimulator:
-    """Manages dynamic order lifecycle with CSV persistence"""
+    """Manages dynamic order lifecycle with SQLite persistence"""
+    
+    # Column order for the orders table and the CSV snapshot
+    FIELDS = (
+        "order_id", "product_id", "product_name", "price", "user_id", "order_date",
+        "current_state", "last_update", "expected_delivery", "actual_delivery",
+        "delay_reason", "stuck",
+    )
+    
+    # Columns a state transition can change
+    MUTABLE_FIELDS = ("current_state", "last_update", "actual_delivery", "delay_reason", "stuck")
     
     def __init__(self, csv_path: str = "orders_db.csv", time_multiplier: int = 3600):
         """
         Initialize order simulator
         
         Args:
-            csv_path: Path to CSV database
+            csv_path: Path to the CSV snapshot (orders.db is created next to it)
             time_multiplier: Seconds per real second (3600 = 1 sec = 1 hour, 86400 = 1 day)
         """
         self.csv_path = Path(csv_path)
+        self.db_path = self.csv_path.with_name("orders.db")
         self.time_multiplier = time_multiplier
+        # Copy-on-write: rows are never mutated and the dict is replaced, not
+        # modified, on update - readers take no lock. self.lock serializes writers.
         self.orders: Dict[str, Dict] = {}
         self.lock = threading.Lock()
+        # The update thread sleeps on this until the next transition is due;
+        # stop() and reset() notify it
+        self._wakeup = threading.Condition(self.lock)
         self._running = False
         self._thread: Optional[threading.Thread] = None
         
+        # Changed order IDs are written to SQLite once per tick; the CSV snapshot
+        # is refreshed every N flushes
+        self.snapshot_every = 10  # flushes
+        self._dirty: set[str] = set()
+        self._flush_count = 0
+        self._io_lock = threading.RLock()  # Serializes DB/CSV writes (update thread vs stop/reset)
+        
+        # Autocommit mode: transactions are opened explicitly around batched writes
+        self.db = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS orders ("
+            "order_id TEXT PRIMARY KEY, product_id TEXT, product_name TEXT, price REAL, "
+            "user_id TEXT, order_date TEXT, current_state TEXT, last_update TEXT, "
+            "expected_delivery TEXT, actual_delivery TEXT, delay_reason TEXT, stuck INTEGER)"
+        )
+        
         # State transition times (in simulated hours)
         self.transition_times = {
             OrderState.PLACED: 1,  # 1 hour to confirm
@@ -66,24 +178,64 @@ class OrderSimulator:
             OrderState.OUT_FOR_DELIVERY: 4,  # 4 hours to deliver
         }
         
-        # Failure probabilities
+        # Failure probabilities, drawn per tick as one batch from a PCG64 generator
+        self._rng = np.random.default_rng()
         self.failure_rates = {
             "stuck": 0.12,  # 12% get stuck
             "returned": 0.05,  # 5% get returned
             "cancelled": 0.08,  # 8% get cancelled
         }
         
+        # Real seconds an order must sit in each state before it can progress
+        # (inf for states without a transition), indexed like _STATES
+        self._required_secs = np.full(len(_STATES), np.inf)
+        for state, hours in self.transition_times.items():
+            self._required_secs[_STATE_INDEX[state.value]] = hours * 3600 / time_multiplier
+        
         self._load_or_create_db()
+        self._build_columns()
+        self._build_user_index()
+    
+    def _build_columns(self):
+        """
+        Mirror the fields the tick reads into NumPy columns (struct of arrays)
+        
+        Position i in every column is order self._ids[i]. Only the writer (the
+        update thread, under self.lock) reads or changes the columns.
+        """
+        orders = list(self.orders.values())
+        self._ids = [order["order_id"] for order in orders]
+        self._state_idx = np.array([_STATE_INDEX[o["current_state"]] for o in orders], dtype=np.int8)
+        self._last_update_epoch = np.array(
+            [datetime.fromisoformat(o["last_update"]).timestamp() for o in orders], dtype=np.float64
+        )
+        self._stuck = np.array([o["stuck"] for o in orders], dtype=bool)
+    
+    def _build_user_index(self):
+        """
+        Index order_ids by user, newest order_date first
+        
+        user_id and order_date never change after creation, so the index only
+        needs rebuilding when the order set is replaced (load / reset).
+        """
+        by_user: Dict[str, List[str]] = {}
+        for order in sorted(self.orders.values(), key=lambda o: o["order_date"], reverse=True):
+            by_user.setdefault(order["user_id"], []).append(order["order_id"])
+        self._by_user = by_user
     
     def _load_or_create_db(self):
-        """Load existing orders or create sample data"""
+        """Load orders from SQLite, else import the CSV snapshot, else create sample data"""
+        if self._load_from_db():
+            return
+        
         if self.csv_path.exists():
             self._load_from_csv()
         else:
-            self._create_sample_orders()
+            self.orders = self._create_sample_orders()
             self._save_to_csv()
+        self._write_all_to_db()
     
-    def _create_sample_orders(self):
+    def _create_sample_orders(self) -> Dict[str, Dict]:
         """Create initial sample orders"""
         products = [
             ("P456", "Wireless Headphones", 89.99),
@@ -97,6 +249,7 @@ class OrderSimulator:
         
         base_time = datetime.now()
         order_id = 98760
+        orders = {}
         
         for i, (prod_id, prod_name, price) in enumerate(products):
             order_id += i
@@ -106,7 +259,7 @@ class OrderSimulator:
             states = list(OrderState)[:7]  # Exclude CANCELLED, RETURNED, STUCK
             state = random.choice(states)
             
-            self.orders[str(order_id)] = {
+            orders[str(order_id)] = {
                 "order_id": str(order_id),
                 "product_id": prod_id,
                 "product_name": prod_name,
@@ -120,116 +273,158 @@ class OrderSimulator:
                 "delay_reason": DelayReason.NONE.value,
                 "stuck": False,
             }
+        
+        return orders
     
     def _load_from_csv(self):
-        """Load orders from CSV"""
+        """Load orders from CSV (values are strings; typed columns are converted)"""
         with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
+                row["price"] = float(row["price"])
+                row["actual_delivery"] = row["actual_delivery"] or None
+                row["stuck"] = row["stuck"] == "True"
                 self.orders[row["order_id"]] = row
     
+    def _load_from_db(self) -> bool:
+        """Load orders from SQLite; returns False if the database is empty"""
+        cursor = self.db.execute(f"SELECT {', '.join(self.FIELDS)} FROM orders")
+        for values in cursor:
+            order = dict(zip(self.FIELDS, values))
+            order["stuck"] = bool(order["stuck"])
+            self.orders[order["order_id"]] = order
+        return bool(self.orders)
+    
+    def _write_all_to_db(self):
+        """Replace the orders table with the in-memory orders"""
+        placeholders = ", ".join("?" * len(self.FIELDS))
+        with self._io_lock:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM orders")
+            self.db.executemany(
+                f"INSERT INTO orders ({', '.join(self.FIELDS)}) VALUES ({placeholders})",
+                [tuple(order[f] for f in self.FIELDS) for order in self.orders.values()]
+            )
+            self.db.execute("COMMIT")
+    
     def _save_to_csv(self):
-        """Save orders to CSV"""
+        """Save orders to CSV (written to a temp file and swapped in atomically)"""
         if not self.orders:
             return
         
-        with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = list(next(iter(self.orders.values())).keys())
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.orders.values())
+        row = itemgetter(*self.FIELDS)
+        tmp_path = self.csv_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELDS)
+            writer.writerows(map(row, self.orders.values()))
+        os.replace(tmp_path, self.csv_path)
+    
+    def _flush(self, snapshot: bool = False):
+        """
+        Write changed orders to SQLite in one transaction (O(changes), not O(orders))
+        
+        Args:
+            snapshot: Also refresh the CSV snapshot (otherwise every N flushes)
+        """
+        assignments = ", ".join(f"{f}=?" for f in self.MUTABLE_FIELDS)
+        with self._io_lock:
+            with self.lock:
+                rows = [
+                    tuple(self.orders[order_id][f] for f in self.MUTABLE_FIELDS) + (order_id,)
+                    for order_id in self._dirty
+                ]
+                self._dirty.clear()
+            
+            if rows:
+                self.db.execute("BEGIN")
+                self.db.executemany(f"UPDATE orders SET {assignments} WHERE order_id=?", rows)
+                self.db.execute("COMMIT")
+                self._flush_count += 1
+            
+            if snapshot or self._flush_count >= self.snapshot_every:
+                with self.lock:
+                    self._save_to_csv()
+                self._flush_count = 0
     
     def get_order(self, order_id: str) -> Optional[Dict]:
-        """Get order by ID"""
-        with self.lock:
-            return self.orders.get(order_id, None)
+        """Get order by ID (lock-free; the returned row must not be modified)"""
+        return self.orders.get(order_id, None)
     
     def get_user_orders(self, user_id: str, limit: int = 10) -> List[Dict]:
-        """Get all orders for a user"""
-        with self.lock:
-            user_orders = [o for o in self.orders.values() if o["user_id"] == user_id]
-            # Sort by order date descending
-            user_orders.sort(key=lambda x: x["order_date"], reverse=True)
-            return user_orders[:limit]
+        """Get a user's most recent orders (lock-free; the returned rows must not be modified)"""
+        orders = self.orders
+        return [orders[order_id] for order_id in self._by_user.get(user_id, ())[:limit]
+                if order_id in orders]
     
-    def _progress_order(self, order: Dict) -> bool:
-        """Progress order to next state, return True if changed"""
-        current_state = OrderState(order["current_state"])
-        
-        # Skip if already in terminal state
-        if current_state in [OrderState.DELIVERED, OrderState.CANCELLED, OrderState.RETURNED]:
-            return False
-        
-        # Check if stuck
-        if order.get("stuck") == "True" or order.get("stuck") is True:
-            return False
-        
-        # Calculate time since last update
-        last_update = datetime.fromisoformat(order["last_update"])
-        now = datetime.now()
-        elapsed_real = (now - last_update).total_seconds()
-        elapsed_simulated_hours = (elapsed_real / self.time_multiplier) * 3600
-        
-        # Check if enough time has passed for state transition
-        required_time = self.transition_times.get(current_state, 99999)
+    def _tick(self) -> Dict[str, Dict]:
+        """
+        Advance every order that is due, in bulk over the NumPy columns
         
-        if elapsed_simulated_hours < required_time:
-            return False
+        Returns:
+            Updated copies of the orders that changed, by order_id
+        """
+        if not self._ids:
+            return {}
         
-        # Introduce random failures
-        if random.random() < self.failure_rates["stuck"]:
-            order["stuck"] = True
-            order["current_state"] = OrderState.STUCK.value
-            order["delay_reason"] = random.choice(list(DelayReason)[:-1]).value
-            order["last_update"] = now.isoformat()
-            return True
+        now = time.time()
         
-        if random.random() < self.failure_rates["cancelled"]:
-            order["current_state"] = OrderState.CANCELLED.value
-            order["last_update"] = now.isoformat()
-            return True
+        # Due orders (still progressing, not stuck, held long enough in the
+        # current state) get stuck or cancelled at random, otherwise progress
+        eligible, stuck_mask = _advance(
+            self._state_idx, self._last_update_epoch, self._stuck, self._required_secs, now,
+            self._rng.random((2, len(self._ids))),
+            self.failure_rates["stuck"], self.failure_rates["cancelled"],
+        )
+        if not eligible.any():
+            return {}
         
-        # Progress to next state
-        state_progression = [
-            OrderState.PLACED,
-            OrderState.CONFIRMED,
-            OrderState.PACKED,
-            OrderState.DISPATCHED,
-            OrderState.IN_TRANSIT,
-            OrderState.OUT_FOR_DELIVERY,
-            OrderState.DELIVERED,
-        ]
+        # Materialize new rows only for the orders that changed
+        now_iso = datetime.fromtimestamp(now).isoformat()
+        delay_reasons = iter(self._rng.choice(_DELAY_REASONS, size=int(stuck_mask.sum())).tolist())
+        changed = {}
+        for i in np.flatnonzero(eligible):
+            order = dict(self.orders[self._ids[i]])
+            state = int(self._state_idx[i])
+            order["current_state"] = _STATES[state]
+            order["last_update"] = now_iso
+            if stuck_mask[i]:
+                order["stuck"] = True
+                order["delay_reason"] = next(delay_reasons)
+            elif state == _DELIVERED:
+                order["actual_delivery"] = now_iso
+            changed[order["order_id"]] = order
         
-        try:
-            current_idx = state_progression.index(current_state)
-            if current_idx < len(state_progression) - 1:
-                next_state = state_progression[current_idx + 1]
-                order["current_state"] = next_state.value
-                order["last_update"] = now.isoformat()
-                
-                # Set actual delivery if delivered
-                if next_state == OrderState.DELIVERED:
-                    order["actual_delivery"] = now.isoformat()
-                
-                return True
-        except ValueError:
-            pass
+        return changed
+    
+    def _seconds_until_due(self, max_wait: float = 5.0, min_wait: float = 0.1) -> float:
+        """Seconds until the earliest order can progress, clamped to [min_wait, max_wait]"""
+        if not self._ids:
+            return max_wait
         
-        return False
+        remaining = self._required_secs[self._state_idx] - (time.time() - self._last_update_epoch)
+        remaining[self._stuck] = np.inf
+        return float(np.clip(remaining.min(), min_wait, max_wait))
     
     def _update_cycle(self):
         """Background thread to progress orders"""
         while self._running:
-            changed = False
             with self.lock:
-                for order in self.orders.values():
-                    if self._progress_order(order):
-                        changed = True
+                changed = self._tick()
+                if changed:
+                    # Publish a new dict in one assignment: readers see the old or
+                    # the new snapshot, never a half-applied tick
+                    self.orders = {**self.orders, **changed}
+                    self._dirty.update(changed)
             
-            if changed:
-                self._save_to_csv()
+            # Persist only the orders that changed this tick
+            if self._dirty:
+                self._flush()
             
-            time.sleep(5)  # Check every 5 seconds
+            # Sleep until the next transition is due (at most 5 seconds)
+            with self._wakeup:
+                if self._running:
+                    self._wakeup.wait(timeout=self._seconds_until_due())
     
     def start(self):
         """Start background order progression"""
@@ -241,28 +436,38 @@ class OrderSimulator:
     
     def stop(self):
         """Stop background progression"""
-        self._running = False
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify()
         if self._thread:
             self._thread.join(timeout=2)
-        self._save_to_csv()
+        self._flush(snapshot=True)
         print("[OrderSimulator] Stopped and saved")
     
     def reset(self):
         """Reset to fresh sample data"""
-        with self.lock:
-            self.orders.clear()
-            self._create_sample_orders()
+        with self._io_lock, self.lock:
+            self.orders = self._create_sample_orders()
+            self._build_columns()
+            self._build_user_index()
+            self._dirty.clear()
             self._save_to_csv()
+            self._write_all_to_db()
+            self._wakeup.notify()
         print("[OrderSimulator] Reset to initial state")
 
 
 # Global instance
 _simulator: Optional[OrderSimulator] = None
+_simulator_lock = threading.Lock()
 
 def get_simulator() -> OrderSimulator:
-    """Get global simulator instance"""
+    """Get global simulator instance (created once, even under concurrent first calls)"""
     global _simulator
     if _simulator is None:
-        _simulator = OrderSimulator()
-        _simulator.start()
+        with _simulator_lock:
+            if _simulator is None:
+                simulator = OrderSimulator()
+                simulator.start()
+                _simulator = simulator
     return _simulator
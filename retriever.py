@@ -2,34 +2,87 @@
 RAG Retriever: Policy document embedding and retrieval with conflict detection
 """
 
+import hashlib
 import os
+import re
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Tuple
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 import chromadb
 from chromadb.config import Settings
 import config
 
 
+# Word boundaries for chunking
+_WORD_RE = re.compile(r"\S+")
+
+# Conflict-detection keywords, one alternation per topic (single scan per policy)
+_REFUND_RE = re.compile("|".join(map(re.escape, ['refund', 'no refund', 'not eligible'])), re.IGNORECASE)
+_DELAY_RE = re.compile("|".join(map(re.escape, ['48 hours', '7 days', 'immediate'])), re.IGNORECASE)
+
+# HNSW index parameters for the policy collection (cosine over normalized MiniLM vectors)
+_HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
+
+# Embedding models by name, shared by every retriever/agent in the process
+_MODEL_CACHE: Dict[str, SentenceTransformer] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_embedding_model(name: str = None) -> SentenceTransformer:
+    """
+    Load an embedding model once per process
+    
+    The lock makes concurrent first calls (agents warming up on worker
+    threads) wait for a single load instead of each reading the weights.
+    On GPU the model runs in float16; outputs are cast back to float32 for the
+    index. CPU inference stays float32 (half precision is slower there).
+    """
+    name = name or config.EMBEDDING_MODEL
+    model = _MODEL_CACHE.get(name)
+    if model is not None:
+        return model
+    
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(name)
+        if model is None:
+            import torch
+            if torch.cuda.is_available():
+                model = SentenceTransformer(name, device="cuda").half()
+            else:
+                model = SentenceTransformer(name, device="cpu")
+            _MODEL_CACHE[name] = model
+        return model
+
+
 class PolicyRetriever:
     """
     Handles policy document embedding, retrieval, and conflict detection
     """
     
     def __init__(self):
-        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL)
+        self.embedding_model = _get_embedding_model()
         
-        # Initialize ChromaDB for vector storage
-        self.chroma_client = chromadb.Client(Settings(
-            anonymized_telemetry=False,
-            is_persistent=False
-        ))
-        
-        self.collection = self.chroma_client.create_collection(
-            name="policies",
-            metadata={"description": "E-commerce policy documents"}
+        # Persistent ChromaDB so policy embeddings survive process restarts
+        self.chroma_client = chromadb.PersistentClient(
+            path=config.POLICY_CACHE_DIR,
+            settings=Settings(anonymized_telemetry=False)
         )
         
+        self.collection = None
         self.policies_loaded = False
+        
+        # LRU of normalized query embeddings (retrieve may run on several threads)
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
     
     def load_policies(self, policy_dir: str = None):
         """
@@ -44,37 +97,23 @@ class PolicyRetriever:
             self._load_sample_policies()
             return
         
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for filename in os.listdir(policy_dir):
+        policy_files = {}
+        for filename in sorted(os.listdir(policy_dir)):
             if filename.endswith('.txt'):
                 filepath = os.path.join(policy_dir, filename)
                 with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # Chunk the document
-                chunks = self._chunk_text(content, config.CHUNK_SIZE, config.CHUNK_OVERLAP)
-                
-                for i, chunk in enumerate(chunks):
-                    documents.append(chunk)
-                    metadatas.append({
-                        "source": filename,
-                        "chunk_id": i,
-                        "policy_type": filename.replace('.txt', '').replace('_', ' ')
-                    })
-                    ids.append(f"{filename}_{i}")
+                    policy_files[filename] = f.read()
         
-        if documents:
-            # Embed and store
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
+        # Reuse the on-disk index if these exact policy files were embedded before
+        if policy_files and self._open_collection(policy_files):
+            self.policies_loaded = True
+            print(f"Loaded {self.collection.count()} policy chunks from cache")
+            return
+        
+        chunk_count = self._add_policies(policy_files)
+        if chunk_count:
             self.policies_loaded = True
-            print(f"Loaded {len(documents)} policy chunks from {len(set([m['source'] for m in metadatas]))} files")
+            print(f"Loaded {chunk_count} policy chunks from {len(policy_files)} files")
         else:
             print("No policy files found, using sample policies")
             self._load_sample_policies()
@@ -160,11 +199,30 @@ Section 3: Hidden Charges
             """
         }
         
+        if self._open_collection(sample_policies):
+            self.policies_loaded = True
+            print(f"✓ Loaded {self.collection.count()} sample policy chunks from cache")
+            return
+        
+        chunk_count = self._add_policies(sample_policies)
+        self.policies_loaded = True
+        print(f"✓ Loaded {chunk_count} sample policy chunks")
+    
+    def _add_policies(self, policy_files: Dict[str, str]) -> int:
+        """
+        Chunk, embed and store policy texts in the open collection
+        
+        Embeddings come from our own model in one batched encode, so Chroma's
+        default embedding function is never loaded or run.
+        
+        Returns:
+            Number of chunks added
+        """
         documents = []
         metadatas = []
         ids = []
         
-        for filename, content in sample_policies.items():
+        for filename, content in policy_files.items():
             chunks = self._chunk_text(content, config.CHUNK_SIZE, config.CHUNK_OVERLAP)
             for i, chunk in enumerate(chunks):
                 documents.append(chunk)
@@ -175,25 +233,74 @@ Section 3: Hidden Charges
                 })
                 ids.append(f"{filename}_{i}")
         
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
+        if documents:
+            embeddings = self.embedding_model.encode(
+                documents,
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            self.collection.add(
+                embeddings=embeddings.astype(np.float32).tolist(),
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids
+            )
+        return len(documents)
+    
+    def _open_collection(self, policy_files: Dict[str, str]) -> bool:
+        """
+        Open the collection for this exact set of policy texts
+        
+        Collections are named by a hash of the embedding model, chunking
+        parameters, index settings and policy contents, so changing any of them
+        produces a fresh index; stale ones are dropped.
+        
+        Returns:
+            True if the collection already holds embedded chunks
+        """
+        signature = (
+            config.EMBEDDING_MODEL,
+            config.CHUNK_SIZE,
+            config.CHUNK_OVERLAP,
+            sorted(_HNSW_METADATA.items()),
         )
-        self.policies_loaded = True
-        print(f"✓ Loaded {len(documents)} sample policy chunks")
+        digest = hashlib.sha256(repr(signature).encode('utf-8'))
+        for filename, content in sorted(policy_files.items()):
+            digest.update(filename.encode('utf-8'))
+            digest.update(content.encode('utf-8'))
+        name = f"policies_{digest.hexdigest()[:16]}"
+        
+        for collection in self.chroma_client.list_collections():
+            existing = getattr(collection, "name", collection)
+            if existing.startswith("policies_") and existing != name:
+                self.chroma_client.delete_collection(existing)
+        
+        self.collection = self.chroma_client.get_or_create_collection(
+            name=name,
+            metadata={"description": "E-commerce policy documents", **_HNSW_METADATA}
+        )
+        return self.collection.count() > 0
     
     def _chunk_text(self, text: str, chunk_size: int, overlap: int) -> List[str]:
         """
-        Split text into overlapping chunks
+        Split text into overlapping chunks of chunk_size words
+        
+        One regex pass records word offsets; each chunk is a single slice of the
+        original text (no per-chunk word lists or joins). Line breaks inside a
+        chunk are kept.
         """
-        words = text.split()
-        chunks = []
+        starts = []
+        ends = []
+        for match in _WORD_RE.finditer(text):
+            starts.append(match.start())
+            ends.append(match.end())
         
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk:
-                chunks.append(chunk)
+        chunks = []
+        for i in range(0, len(starts), chunk_size - overlap):
+            last = min(i + chunk_size, len(starts)) - 1
+            chunks.append(text[starts[i]:ends[last]])
         
         return chunks
     
@@ -204,30 +311,78 @@ Section 3: Hidden Charges
         Returns:
             List of dicts with 'content', 'source', 'relevance_score'
         """
+        return self.retrieve_batch([query], top_k)[0]
+    
+    def retrieve_batch(self, queries: List[str], top_k: int = None) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve top-k policy chunks for several queries at once
+        
+        All queries are embedded in one forward pass and searched with a single
+        multi-query index call.
+        
+        Returns:
+            One result list per query, in input order (same shape as retrieve)
+        """
+        if not queries:
+            return []
+        
         if not self.policies_loaded:
             self.load_policies()
         
         if top_k is None:
             top_k = config.TOP_K_POLICIES
         
+        query_embeddings = self._embed_queries(queries)
         results = self.collection.query(
-            query_texts=[query],
+            query_embeddings=query_embeddings.tolist(),
             n_results=top_k
         )
         
-        retrieved_policies = []
+        batch = []
         
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
-                retrieved_policies.append({
-                    'content': doc,
-                    'source': results['metadatas'][0][i]['source'],
-                    'policy_type': results['metadatas'][0][i]['policy_type'],
-                    'relevance_score': 1 - results['distances'][0][i] if 'distances' in results else 1.0,
-                    'chunk_id': results['metadatas'][0][i]['chunk_id']
-                })
+        for q in range(len(queries)):
+            retrieved_policies = []
+            
+            if results['documents'] and results['documents'][q]:
+                for i, doc in enumerate(results['documents'][q]):
+                    retrieved_policies.append({
+                        'content': doc,
+                        'source': results['metadatas'][q][i]['source'],
+                        'policy_type': results['metadatas'][q][i]['policy_type'],
+                        'relevance_score': 1 - results['distances'][q][i] if 'distances' in results else 1.0,
+                        'chunk_id': results['metadatas'][q][i]['chunk_id']
+                    })
+            
+            batch.append(retrieved_policies)
         
-        return retrieved_policies
+        return batch
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, reusing cached vectors; misses are encoded in one batch"""
+        with self._query_embeddings_lock:
+            found = {}
+            for query in queries:
+                embedding = self._query_embeddings.get(query)
+                if embedding is not None:
+                    self._query_embeddings.move_to_end(query)
+                    found[query] = embedding
+        
+        missing = list(dict.fromkeys(q for q in queries if q not in found))
+        if missing:
+            embeddings = self.embedding_model.encode(
+                missing,
+                batch_size=32,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            with self._query_embeddings_lock:
+                for query, embedding in zip(missing, embeddings):
+                    found[query] = embedding
+                    self._query_embeddings[query] = embedding
+                while len(self._query_embeddings) > config.QUERY_EMBEDDING_CACHE_SIZE:
+                    self._query_embeddings.popitem(last=False)
+        
+        return np.stack([found[q] for q in queries])
     
     def detect_conflicts(self, policies: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
         """
@@ -242,11 +397,14 @@ Section 3: Hidden Charges
         sources = set([p['source'] for p in policies])
         if len(sources) > 1:
             # Check for contradictory statements (simple keyword-based detection)
-            refund_keywords = ['refund', 'no refund', 'not eligible']
-            delay_keywords = ['48 hours', '7 days', 'immediate']
-            
-            refund_mentions = [p for p in policies if any(kw in p['content'].lower() for kw in refund_keywords)]
-            delay_mentions = [p for p in policies if any(kw in p['content'].lower() for kw in delay_keywords)]
+            refund_mentions = []
+            delay_mentions = []
+            for p in policies:
+                content = p['content']
+                if _REFUND_RE.search(content):
+                    refund_mentions.append(p)
+                if _DELAY_RE.search(content):
+                    delay_mentions.append(p)
             
             if len(refund_mentions) > 1:
                 conflicts.append(
@@ -267,7 +425,7 @@ Section 3: Hidden Charges
         if not policies:
             return "No relevant policies found."
         
-        formatted = "📋 RELEVANT POLICIES:\n\n"
+        formatted = "[POLICIES]\n\n"
         
         for i, policy in enumerate(policies, 1):
             formatted += f"{i}. From {policy['policy_type']} (relevance: {policy['relevance_score']:.2f}):\n"
@@ -276,7 +434,7 @@ Section 3: Hidden Charges
         # Add conflict warnings
         has_conflicts, conflict_msgs = self.detect_conflicts(policies)
         if has_conflicts:
-            formatted += "⚠ POLICY CONFLICTS DETECTED:\n"
+            formatted += "[WARN] POLICY CONFLICTS DETECTED:\n"
             for msg in conflict_msgs:
                 formatted += f"   - {msg}\n"
             formatted += "\n"
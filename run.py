@@ -3,21 +3,27 @@ CLI Interface for E-Commerce Order Resolution Agent
 LangGraph-based ReAct agent with interactive and test modes
 """
 
+import argparse
+import asyncio
 import sys
+import time
+import uuid
 from datetime import datetime
+from functools import lru_cache
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.markdown import Markdown
+from rich.text import Text
 from agent import ReActAgent
+from tools import clear_tool_cache
 import config
 
 console = Console()
 
 
-def print_banner():
-    """Display welcome banner"""
-    banner = """
+# Renderables built once: rich skips markup parsing when printing Text objects
+_BANNER = Text("""
 ╔═══════════════════════════════════════════════════════════════╗
 ║                                                               ║
 ║     🤖  E-Commerce Order Resolution Agent (LangGraph)       ║
@@ -26,8 +32,28 @@ def print_banner():
 ║     Model: Llama 3.3 70B Versatile                          ║
 ║                                                               ║
 ╚═══════════════════════════════════════════════════════════════╝
-    """
-    console.print(banner, style="bold cyan")
+    """, style="bold cyan")
+_RESPONSE_TITLE = Text("✓ Agent Response", style="bold green")
+
+
+def _test_title(i: int) -> Text:
+    return Text(f"✓ Test {i} Complete", style="bold green")
+
+
+def _new_thread_id() -> str:
+    """Fresh conversation thread (the checkpointer persists threads across processes)"""
+    return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+@lru_cache(maxsize=1)
+def _get_agent() -> ReActAgent:
+    """One agent per process, shared by interactive, test and single-query modes"""
+    return ReActAgent()
+
+
+def print_banner():
+    """Display welcome banner"""
+    console.print(_BANNER)
 
 
 def run_interactive_mode():
@@ -36,8 +62,8 @@ def run_interactive_mode():
     console.print("\n💬 Interactive Mode - Type 'exit' to quit, 'test' to run test queries", style="bold green")
     console.print("💡 Conversation memory is enabled! Agent remembers context within the session.\n", style="bold yellow")
     
-    agent = ReActAgent()
-    thread_id = "interactive_session"  # Single thread for interactive mode
+    agent = _get_agent()
+    thread_id = _new_thread_id()  # One thread per session until 'new'
     
     while True:
         try:
@@ -52,7 +78,8 @@ def run_interactive_mode():
                 continue
             
             if user_input.lower() == 'new':
-                thread_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                thread_id = _new_thread_id()
+                clear_tool_cache()
                 console.print(f"\n🔄 Started new conversation thread: {thread_id}\n", style="bold cyan")
                 continue
             
@@ -65,8 +92,8 @@ def run_interactive_mode():
             
             # Display response in a panel
             console.print(Panel(
-                response,
-                title="[bold green]✓ Agent Response[/bold green]",
+                Text(response),
+                title=_RESPONSE_TITLE,
                 border_style="green"
             ))
             
@@ -77,8 +104,16 @@ def run_interactive_mode():
             console.print(f"\n[bold red]❌ Error:[/bold red] {str(e)}\n")
 
 
-def run_test_queries():
-    """Run predefined test queries"""
+def run_test_queries(pace: float = 0.0, gate: bool = False, parallel: bool = False):
+    """
+    Run predefined test queries
+    
+    Args:
+        pace: Seconds to sleep between sequential tests (0 = no pause)
+        gate: Wait for Enter between sequential tests (overrides pace)
+        parallel: Run all queries concurrently (agent.run_many) without pausing
+            between tests; sequential mode keeps the verbose per-test trace
+    """
     console.print("\n" + "="*80, style="bold cyan")
     console.print("🧪 RUNNING TEST QUERIES", style="bold cyan")
     console.print("="*80 + "\n", style="bold cyan")
@@ -114,7 +149,12 @@ def run_test_queries():
         }
     ]
     
-    agent = ReActAgent()
+    agent = _get_agent()
+    thread_id = _new_thread_id()
+    
+    if parallel:
+        _run_test_queries_parallel(agent, test_queries)
+        return
     
     for i, test_case in enumerate(test_queries, 1):
         console.print(f"\n{'─'*80}", style="cyan")
@@ -124,11 +164,11 @@ def run_test_queries():
         console.print(f"[bold blue]Query:[/bold blue] {test_case['query']}\n")
         
         try:
-            response = agent.run(test_case['query'], verbose=True)
+            response = agent.run(test_case['query'], thread_id=thread_id, verbose=True)
             
             console.print(Panel(
-                response,
-                title=f"[bold green]✓ Test {i} Complete[/bold green]",
+                Text(response),
+                title=_test_title(i),
                 border_style="green"
             ))
             
@@ -136,7 +176,38 @@ def run_test_queries():
             console.print(f"[bold red]❌ Test {i} Failed:[/bold red] {str(e)}")
         
         if i < len(test_queries):
-            input("\nPress Enter to continue to next test...")
+            if gate:
+                input("\nPress Enter to continue to next test...")
+            elif pace > 0:
+                time.sleep(pace)
+    
+    console.print(f"\n{'='*80}", style="bold green")
+    console.print("✅ ALL TESTS COMPLETED", style="bold green")
+    console.print(f"{'='*80}\n", style="bold green")
+
+
+def _run_test_queries_parallel(agent: ReActAgent, test_queries: list):
+    """Resolve every test query concurrently, then print the results in order"""
+    def on_progress(done: int, total: int):
+        console.print(f"[cyan]… {done}/{total} queries finished[/cyan]")
+    
+    answers = asyncio.run(agent.run_many([tc["query"] for tc in test_queries], on_progress=on_progress))
+    
+    for i, (test_case, answer) in enumerate(zip(test_queries, answers), 1):
+        console.print(f"\n{'─'*80}", style="cyan")
+        console.print(f"TEST {i}/{len(test_queries)}: {test_case['description']}", style="bold cyan")
+        console.print(f"{'─'*80}\n", style="cyan")
+        console.print(f"[bold blue]Query:[/bold blue] {test_case['query']}\n")
+        
+        if isinstance(answer, Exception):
+            console.print(f"[bold red]❌ Test {i} Failed:[/bold red] {str(answer)}")
+            continue
+        
+        console.print(Panel(
+            Text(answer),
+            title=_test_title(i),
+            border_style="green"
+        ))
     
     console.print(f"\n{'='*80}", style="bold green")
     console.print("✅ ALL TESTS COMPLETED", style="bold green")
@@ -148,29 +219,78 @@ def run_single_query(query: str):
     print_banner()
     console.print(f"\n[bold blue]Query:[/bold blue] {query}\n")
     
-    agent = ReActAgent()
-    response = agent.run(query, verbose=True)
+    agent = _get_agent()
+    response = agent.run(query, thread_id=_new_thread_id(), verbose=True)
     
     console.print(Panel(
-        response,
-        title="[bold green]✓ Agent Response[/bold green]",
+        Text(response),
+        title=_RESPONSE_TITLE,
         border_style="green"
     ))
 
 
+# CLI flags -> number of values they take (query words are everything else)
+_FLAG_ARITY = {"--parallel": 0, "--interactive-gate": 0, "--pace": 1}
+
+
+def _query_words(argv: list) -> list:
+    """argv minus the recognized flags (and their values), in original order"""
+    words = []
+    tokens = iter(argv)
+    for token in tokens:
+        name, has_value, _ = token.partition("=")
+        if name in _FLAG_ARITY:
+            if not has_value:
+                for _ in range(_FLAG_ARITY[name]):
+                    next(tokens, None)
+            continue
+        words.append(token)
+    return words
+
+
+def _parse_args(argv: list) -> argparse.Namespace:
+    """
+    Parse CLI flags; the remaining words form the query
+    
+    Unknown dash-prefixed words (e.g. "refund -2 items") belong to the query,
+    so they are collected instead of rejected. -h / --help prints usage and exits.
+    """
+    parser = argparse.ArgumentParser(
+        description="E-Commerce Order Resolution Agent. No arguments starts interactive "
+                    "mode; 'test' runs the test queries; anything else is a single query.",
+        allow_abbrev=False
+    )
+    parser.add_argument("query", nargs="*", help="'test' or the query text")
+    parser.add_argument("--parallel", action="store_true",
+                        help="test mode: run all queries concurrently")
+    parser.add_argument("--pace", type=float, default=0.0, metavar="SECONDS",
+                        help="test mode: sleep between tests (default: 0, no pause)")
+    parser.add_argument("--interactive-gate", action="store_true",
+                        help="test mode: wait for Enter between tests")
+    args, _ = parser.parse_known_args(argv)
+    words = _query_words(argv)
+    args.test_mode = words == ["test"]
+    args.query_text = " ".join(words)
+    return args
+
+
 def main():
     """Main entry point"""
-    if len(sys.argv) > 1:
-        # Command line argument provided
-        if sys.argv[1] == "test":
-            run_test_queries()
-        else:
+    args = _parse_args(sys.argv[1:])
+    
+    try:
+        if args.test_mode:
+            run_test_queries(pace=args.pace, gate=args.interactive_gate, parallel=args.parallel)
+        elif args.query_text:
             # Treat as single query
-            query = " ".join(sys.argv[1:])
-            run_single_query(query)
-    else:
-        # Interactive mode
-        run_interactive_mode()
+            run_single_query(args.query_text)
+        else:
+            # Interactive mode
+            run_interactive_mode()
+    finally:
+        # Close the checkpointer connection so its worker thread doesn't block exit
+        if _get_agent.cache_info().currsize:
+            _get_agent().close()
 
 
 if __name__ == "__main__":
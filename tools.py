@@ -3,24 +3,75 @@ Tool layer for E-Commerce Order Resolution Agent
 Uses dynamic order simulator for realistic API behavior
 """
 
+import asyncio
 import random
+import re
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Mapping, Optional, List, NamedTuple, Sequence, Tuple
 from enum import Enum
+from types import MappingProxyType
+
+import numpy as np
+import orjson
+
 import config
-from order_simulator import get_simulator, OrderState
+from order_simulator import get_simulator, OrderSimulator, OrderState
+
+
+class Product(NamedTuple):
+    """Immutable catalog record (stock None = stock level unknown)"""
+    name: str
+    category: str
+    price: float
+    stock: Optional[int] = None
 
 
 # Static product catalog (products don't change like orders)
 PRODUCT_CATALOG = {
-    "P001": {"name": "Wireless Headphones", "category": "Electronics", "stock": 45, "price": 79.99},
-    "P002": {"name": "Running Shoes", "category": "Sports", "stock": 0, "price": 89.99},
-    "P003": {"name": "Coffee Maker", "category": "Home", "stock": 23, "price": 129.99},
-    "P004": {"name": "Yoga Mat", "category": "Sports", "stock": 67, "price": 34.99},
-    "P005": {"name": "Laptop Stand", "category": "Electronics", "price": 49.99},  # Missing stock
+    "P001": Product(name="Wireless Headphones", category="Electronics", stock=45, price=79.99),
+    "P002": Product(name="Running Shoes", category="Sports", stock=0, price=89.99),
+    "P003": Product(name="Coffee Maker", category="Home", stock=23, price=129.99),
+    "P004": Product(name="Yoga Mat", category="Sports", stock=67, price=34.99),
+    "P005": Product(name="Laptop Stand", category="Electronics", price=49.99),  # Missing stock
+    "P123": Product(name="Smartphone X", category="Electronics", stock=45, price=699.99),
+    "P456": Product(name="Wireless Headphones", category="Electronics", stock=0, price=89.99),  # Out of stock
+    "P789": Product(name="Smart Watch", category="Electronics", stock=12, price=299.99),
+    "P999": Product(name="Gaming Laptop", category="Electronics", price=1299.99),  # Missing stock
 }
 
+# Column (struct-of-arrays) view of the catalog for bulk lookups; row i is
+# _PRODUCT_IDS[i]. Stock -1 = unknown. Single lookups keep using the records.
+_PRODUCT_IDS = tuple(PRODUCT_CATALOG)
+_PRODUCT_ROW = {product_id: i for i, product_id in enumerate(_PRODUCT_IDS)}
+_PRODUCT_NAME = np.array([p.name for p in PRODUCT_CATALOG.values()], dtype=object)
+_PRODUCT_CATEGORY = np.array([p.category for p in PRODUCT_CATALOG.values()], dtype=object)
+_PRODUCT_PRICE = np.array([p.price for p in PRODUCT_CATALOG.values()], dtype=np.float64)
+_PRODUCT_STOCK = np.array(
+    [-1 if p.stock is None else p.stock for p in PRODUCT_CATALOG.values()], dtype=np.int64
+)
+
+
+# Simulator handle, resolved on first tool call (see _sim)
+_SIMULATOR: Optional[OrderSimulator] = None
+
+
+def _sim() -> OrderSimulator:
+    """Return the shared order simulator, caching the handle after the first lookup"""
+    global _SIMULATOR
+    if _SIMULATOR is None:
+        _SIMULATOR = get_simulator()
+    return _SIMULATOR
+
+
+def reset_simulator_cache():
+    """Forget the cached simulator handle (test hook; the next tool call looks it up again)"""
+    global _SIMULATOR
+    _SIMULATOR = None
+
 
 class ToolStatus(Enum):
     SUCCESS = "success"
@@ -29,75 +80,156 @@ class ToolStatus(Enum):
     NOT_FOUND = "not_found"
 
 
+@lru_cache(maxsize=64)
+def _iso_second(second: int) -> str:
+    """ISO 8601 local time for an epoch second (bursts of responses share one format call)"""
+    return datetime.fromtimestamp(second).isoformat()
+
+
+# Enum members are singletons: status checks compare by identity
+_SUCCESS = ToolStatus.SUCCESS
+_PARTIAL = ToolStatus.PARTIAL
+_ERROR = ToolStatus.ERROR
+
+# Shared read-only defaults, so responses without data / missing fields allocate nothing
+_EMPTY_DATA: Mapping[str, Any] = MappingProxyType({})
+_NO_MISSING: Tuple[str, ...] = ()
+
+
 class ToolResponse:
-    """Standardized tool response format"""
-    def __init__(self, status: ToolStatus, data: Optional[Dict[str, Any]] = None, 
-                 error: Optional[str] = None, missing_fields: Optional[List[str]] = None):
+    """
+    Standardized tool response format
+    
+    timestamp is epoch seconds; to_dict() renders it as ISO 8601 at one-second
+    resolution (each second is formatted once, see _iso_second). to_json()
+    returns the same payload as compact UTF-8 bytes.
+    
+    data and missing_fields may be shared empty sentinels: treat them as
+    read-only and copy before modifying.
+    """
+    __slots__ = ("status", "data", "error", "missing_fields", "timestamp")
+    
+    def __init__(self, status: ToolStatus, data: Optional[Mapping[str, Any]] = None, 
+                 error: Optional[str] = None, missing_fields: Optional[Sequence[str]] = None):
         self.status = status
-        self.data = data or {}
+        self.data = data or _EMPTY_DATA
         self.error = error
-        self.missing_fields = missing_fields or []
-        self.timestamp = datetime.now().isoformat()
+        self.missing_fields = missing_fields or _NO_MISSING
+        self.timestamp = time.time()
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "status": self.status.value,
-            "data": self.data,
+            "data": self.data or {},
             "error": self.error,
-            "missing_fields": self.missing_fields,
-            "timestamp": self.timestamp
+            "missing_fields": list(self.missing_fields),
+            "timestamp": _iso_second(int(self.timestamp))
         }
     
+    def to_json(self) -> bytes:
+        return orjson.dumps(self.to_dict())
+    
     def is_successful(self) -> bool:
-        return self.status == ToolStatus.SUCCESS
+        return self.status is _SUCCESS
     
     def is_partial(self) -> bool:
-        return self.status == ToolStatus.PARTIAL
+        return self.status is _PARTIAL
     
     def has_error(self) -> bool:
-        return self.status == ToolStatus.ERROR
-
-
-# Dynamic inventory (not in simulator - this is product catalog)
-INVENTORY = {
-
-    "P123": {
-        "product_id": "P123",
-        "product_name": "Smartphone X",
-        "stock": 45,
-        "price": 699.99,
-        "category": "electronics"
-    },
-    "P456": {
-        "product_id": "P456",
-        "product_name": "Wireless Headphones",
-        "stock": 0,  # Out of stock
-        "price": 89.99,
-        "category": "electronics"
-    },
-    "P789": {
-        "product_id": "P789",
-        "product_name": "Smart Watch",
-        "stock": 12,
-        "price": 299.99,
-        "category": "electronics"
-    },
-    "P999": {
-        "product_id": "P999",
-        "product_name": "Gaming Laptop",
-        # Missing stock field (partial data)
-        "price": 1299.99,
-        "category": "electronics"
-    }
-}
+        return self.status is _ERROR
 
 
 def simulate_delay():
-    """Simulate API latency"""
+    """Simulate API latency (blocks the calling thread)"""
     if config.SIMULATE_DELAYS:
         time.sleep(random.uniform(0.1, 0.5))
 
 
+async def simulate_delay_async():
+    """Simulate API latency without blocking the event loop"""
+    if config.SIMULATE_DELAYS:
+        await asyncio.sleep(random.uniform(0.1, 0.5))
+
+
+# Recent tool responses by (tool body, args): repeated lookups within a ReAct
+# trajectory skip the simulated latency and failure rolls. Entries are shared,
+# so cached responses must be treated as read-only.
+# Only catalog lookups are cached - order, refund and user-order results come
+# from the live simulator and must reflect its latest state on every call.
+_CACHEABLE_BODIES = frozenset({"_inventory", "_inventory_bulk"})
+_tool_cache: "OrderedDict[tuple, Tuple[float, ToolResponse]]" = OrderedDict()
+_tool_cache_lock = threading.Lock()
+
+
+def clear_tool_cache():
+    """Drop all cached tool responses (e.g. when a new conversation starts)"""
+    with _tool_cache_lock:
+        _tool_cache.clear()
+
+
+def _cached_response(key: tuple) -> Optional[ToolResponse]:
+    with _tool_cache_lock:
+        entry = _tool_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= config.TOOL_CACHE_TTL:
+            del _tool_cache[key]
+            return None
+        _tool_cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_response(key: tuple, response: ToolResponse) -> ToolResponse:
+    # Errors and (possibly randomly injected) partial data are never pinned
+    if config.TOOL_CACHE_TTL > 0 and response.is_successful():
+        with _tool_cache_lock:
+            _tool_cache[key] = (time.monotonic(), response)
+            _tool_cache.move_to_end(key)
+            while len(_tool_cache) > config.TOOL_CACHE_MAX_ENTRIES:
+                _tool_cache.popitem(last=False)
+    return response
+
+
+def _call(body, *args) -> ToolResponse:
+    """Run a tool body after the simulated latency, unless a recent response is cached"""
+    if body.__name__ not in _CACHEABLE_BODIES:
+        simulate_delay()
+        return body(*args)
+    key = (body.__name__, args)
+    cached = _cached_response(key)
+    if cached is not None:
+        return cached
+    simulate_delay()
+    return _cache_response(key, body(*args))
+
+
+async def _call_async(body, *args) -> ToolResponse:
+    """Async variant of _call"""
+    if body.__name__ not in _CACHEABLE_BODIES:
+        await simulate_delay_async()
+        return body(*args)
+    key = (body.__name__, args)
+    cached = _cached_response(key)
+    if cached is not None:
+        return cached
+    await simulate_delay_async()
+    return _cache_response(key, body(*args))
+
+
+# get_order_status failure modes, chosen with one random.choice per call
+_ORDER_ERRORS = (
+    "Database connection timeout. Please try again.",
+    "Order service unavailable",
+    "API rate limit exceeded",
+    "Internal server error",
+)
+_ORDER_PARTIAL_SUBSETS = (
+    ("actual_delivery",), ("last_update",), ("delay_reason",),
+    ("actual_delivery", "last_update"), ("actual_delivery", "delay_reason"),
+    ("last_update", "delay_reason"),
+)
+
+
 def should_fail() -> bool:
     """Determine if this call should fail"""
     return random.random() < config.TOOL_FAILURE_RATE
@@ -118,23 +250,24 @@ def get_order_status(order_id: str) -> ToolResponse:
     - Not Found: Order ID doesn't exist
     - Error: System failure
     """
-    simulate_delay()
-    
+    return _call(_order_status, order_id)
+
+
+async def get_order_status_async(order_id: str) -> ToolResponse:
+    """Async variant of get_order_status (simulated latency does not block the loop)"""
+    return await _call_async(_order_status, order_id)
+
+
+def _order_status(order_id: str) -> ToolResponse:
     # Simulate intermittent failures (API timeout, etc.)
     if should_fail():
-        error_types = [
-            "Database connection timeout. Please try again.",
-            "Order service unavailable",
-            "API rate limit exceeded",
-            "Internal server error"
-        ]
         return ToolResponse(
             status=ToolStatus.ERROR,
-            error=random.choice(error_types)
+            error=random.choice(_ORDER_ERRORS)
         )
     
     # Get order from simulator
-    simulator = get_simulator()
+    simulator = _sim()
     order = simulator.get_order(order_id)
     
     if not order:
@@ -158,15 +291,12 @@ def get_order_status(order_id: str) -> ToolResponse:
     }
     
     # Add delay info if stuck
-    if order.get("stuck") == "True" or order.get("stuck") is True:
+    if order["stuck"]:
         order_data["delay_reason"] = order.get("delay_reason", "unknown")
     
     # Simulate partial data responses
     if should_return_partial():
-        missing_fields = random.sample(
-            ["actual_delivery", "last_update", "delay_reason"],
-            k=random.randint(1, 2)
-        )
+        missing_fields = list(random.choice(_ORDER_PARTIAL_SUBSETS))
         for field in missing_fields:
             order_data.pop(field, None)
         
@@ -179,54 +309,6 @@ def get_order_status(order_id: str) -> ToolResponse:
     return ToolResponse(status=ToolStatus.SUCCESS, data=order_data)
 
 
-def get_user_orders(user_id: str, limit: int = 5) -> ToolResponse:
-    """
-    Retrieves recent orders for a user from dynamic simulator
-    
-    Returns sorted list of user's orders (newest first)
-    """
-    simulate_delay()
-    
-    # Simulate service failures
-    if should_fail():
-        return ToolResponse(
-            status=ToolStatus.ERROR,
-            error="User service unavailable"
-        )
-    
-    # Get orders from simulator
-    simulator = get_simulator()
-    user_orders = simulator.get_user_orders(user_id, limit=limit)
-    
-    if not user_orders:
-        return ToolResponse(
-            status=ToolStatus.NOT_FOUND,
-            error=f"No orders found for user {user_id}"
-        )
-    
-    # Convert to tool format
-    orders_data = []
-    for order in user_orders:
-        order_item = {
-            "order_id": order["order_id"],
-            "product_id": order["product_id"],
-            "product_name": order["product_name"],
-            "status": order["current_state"],
-            "order_date": order["order_date"],
-            "price": float(order["price"]),
-            "user_id": order["user_id"]
-        }
-        orders_data.append(order_item)
-    
-    return ToolResponse(
-        status=ToolStatus.SUCCESS,
-        data={
-            "orders": orders_data,
-            "count": len(orders_data)
-        }
-    )
-
-
 def get_refund_status(order_id: str) -> ToolResponse:
     """
     Retrieves refund status dynamically based on order state
@@ -236,8 +318,31 @@ def get_refund_status(order_id: str) -> ToolResponse:
     - Not Found: No refund for this order
     - Error: System failure
     """
-    simulate_delay()
+    return _call(_refund_status, order_id)
+
+
+async def get_refund_status_async(order_id: str) -> ToolResponse:
+    """Async variant of get_refund_status (simulated latency does not block the loop)"""
+    return await _call_async(_refund_status, order_id)
+
+
+@lru_cache(maxsize=1024)
+def _refund_dates(order_date: str) -> Tuple[str, str, str]:
+    """
+    Refund timeline for an order date: (initiated, processed if cancelled, processed if returned)
     
+    Keyed by the order_date string rather than order_id, so orders recreated by
+    a simulator reset never see stale dates.
+    """
+    placed = datetime.fromisoformat(order_date)
+    return (
+        (placed + timedelta(hours=1)).isoformat(),
+        (placed + timedelta(hours=2)).isoformat(),
+        (placed + timedelta(days=3)).isoformat(),
+    )
+
+
+def _refund_status(order_id: str) -> ToolResponse:
     if should_fail():
         return ToolResponse(
             status=ToolStatus.ERROR,
@@ -245,7 +350,7 @@ def get_refund_status(order_id: str) -> ToolResponse:
         )
     
     # Get order from simulator to determine if refund exists
-    simulator = get_simulator()
+    simulator = _sim()
     order = simulator.get_order(order_id)
     
     if not order:
@@ -270,17 +375,16 @@ def get_refund_status(order_id: str) -> ToolResponse:
         )
     
     # Generate dynamic refund data
-    from datetime import datetime, timedelta
-    order_date = datetime.fromisoformat(order["order_date"])
+    initiated_date, cancel_processed_date, return_processed_date = _refund_dates(order["order_date"])
     
     if state == "cancelled":
         refund_status = "processed"
         refund_amount = float(order["price"])
-        processed_date = (order_date + timedelta(hours=2)).isoformat()
+        processed_date = cancel_processed_date
     elif state == "returned":
         refund_status = "processed"
         refund_amount = float(order["price"]) - 5.00  # Minus restocking fee
-        processed_date = (order_date + timedelta(days=3)).isoformat()
+        processed_date = return_processed_date
     else:  # delivered with return
         refund_status = "initiated"
         refund_amount = float(order["price"])
@@ -290,7 +394,7 @@ def get_refund_status(order_id: str) -> ToolResponse:
         "order_id": order_id,
         "refund_status": refund_status,
         "refund_amount": refund_amount,
-        "initiated_date": (order_date + timedelta(hours=1)).isoformat(),
+        "initiated_date": initiated_date,
         "processed_date": processed_date
     }
     
@@ -323,53 +427,192 @@ def get_inventory(product_id: str) -> ToolResponse:
     - Not Found: Product doesn't exist
     - Error: System failure
     """
-    simulate_delay()
-    
+    return _call(_inventory, product_id)
+
+
+async def get_inventory_async(product_id: str) -> ToolResponse:
+    """Async variant of get_inventory (simulated latency does not block the loop)"""
+    return await _call_async(_inventory, product_id)
+
+
+def _inventory(product_id: str) -> ToolResponse:
     if should_fail():
         return ToolResponse(
             status=ToolStatus.ERROR,
             error="Inventory service unavailable"
         )
     
-    if product_id not in PRODUCT_CATALOG:
+    product = PRODUCT_CATALOG.get(product_id)
+    if product is None:
         return ToolResponse(
             status=ToolStatus.NOT_FOUND,
             error=f"Product {product_id} not found"
         )
     
-    inventory_data = PRODUCT_CATALOG[product_id].copy()
-    inventory_data["product_id"] = product_id
-    
-    # Check if stock field is missing (partial data)
-    if "stock" not in inventory_data:
+    # Stock missing from the catalog, or randomly withheld (partial data)
+    if product.stock is None or should_return_partial():
         return ToolResponse(
             status=ToolStatus.PARTIAL,
-            data=inventory_data,
+            data={"name": product.name, "category": product.category, "price": product.price,
+                  "product_id": product_id},
             missing_fields=["stock"]
         )
     
-    # Randomly simulate partial data
-    if should_return_partial():
-        del inventory_data["stock"]
+    return ToolResponse(
+        status=ToolStatus.SUCCESS,
+        data={"name": product.name, "category": product.category, "stock": product.stock,
+              "price": product.price, "product_id": product_id}
+    )
+
+
+def get_inventory_bulk(product_ids) -> ToolResponse:
+    """
+    Retrieves inventory for several products in one call (one latency and failure roll)
+    
+    product_ids may be a list or a comma/space separated string ("P001, P002").
+    Possible scenarios:
+    - Success: Every product found with stock info
+    - Partial: Some products unknown or without stock info
+    - Not Found: None of the products exist
+    - Error: System failure
+    """
+    return _call(_inventory_bulk, _id_tuple(product_ids))
+
+
+async def get_inventory_bulk_async(product_ids) -> ToolResponse:
+    """Async variant of get_inventory_bulk (simulated latency does not block the loop)"""
+    return await _call_async(_inventory_bulk, _id_tuple(product_ids))
+
+
+def _inventory_bulk(product_ids: Tuple[str, ...]) -> ToolResponse:
+    if should_fail():
+        return ToolResponse(
+            status=ToolStatus.ERROR,
+            error="Inventory service unavailable"
+        )
+    
+    requested = list(dict.fromkeys(product_ids))
+    found = [product_id for product_id in requested if product_id in _PRODUCT_ROW]
+    not_found = [product_id for product_id in requested if product_id not in _PRODUCT_ROW]
+    if not found:
+        return ToolResponse(
+            status=ToolStatus.NOT_FOUND,
+            error=f"Products {', '.join(not_found) or '(none)'} not found"
+        )
+    
+    # Gather each column for all requested rows at once
+    rows = np.fromiter((_PRODUCT_ROW[product_id] for product_id in found), dtype=np.intp, count=len(found))
+    names = _PRODUCT_NAME.take(rows).tolist()
+    categories = _PRODUCT_CATEGORY.take(rows).tolist()
+    prices = _PRODUCT_PRICE.take(rows).tolist()
+    stocks = _PRODUCT_STOCK.take(rows).tolist()
+    
+    products = []
+    missing_fields = [f"product {product_id}" for product_id in not_found]
+    for product_id, name, category, price, stock in zip(found, names, categories, prices, stocks):
+        item = {"name": name, "category": category, "price": price, "product_id": product_id}
+        if stock < 0:
+            missing_fields.append(f"stock ({product_id})")
+        else:
+            item["stock"] = stock
+        products.append(item)
+    
+    data = {"products": products, "not_found": not_found, "count": len(products)}
+    if missing_fields:
+        return ToolResponse(status=ToolStatus.PARTIAL, data=data, missing_fields=missing_fields)
+    
+    return ToolResponse(status=ToolStatus.SUCCESS, data=data)
+
+
+def get_orders_batch(order_ids) -> ToolResponse:
+    """
+    Retrieves several orders in one call (one latency and failure roll for all)
+    
+    order_ids may be a list or a comma/space separated string ("98762, 98763").
+    Possible scenarios:
+    - Success: Every order found
+    - Partial: Some IDs not found (listed in data["not_found"])
+    - Not Found: None of the IDs exist
+    - Error: System failure
+    """
+    return _call(_orders_batch, _id_tuple(order_ids))
+
+
+async def get_orders_batch_async(order_ids) -> ToolResponse:
+    """Async variant of get_orders_batch (simulated latency does not block the loop)"""
+    return await _call_async(_orders_batch, _id_tuple(order_ids))
+
+
+def _id_tuple(ids) -> Tuple[str, ...]:
+    """Normalize a list or comma/space separated string of IDs (hashable for the tool cache)"""
+    if isinstance(ids, str):
+        return tuple(re.findall(r"[\w-]+", ids))
+    return tuple(str(item) for item in ids)
+
+
+def _orders_batch(order_ids: Tuple[str, ...]) -> ToolResponse:
+    if should_fail():
+        return ToolResponse(
+            status=ToolStatus.ERROR,
+            error="Order service unavailable"
+        )
+    
+    simulator = _sim()
+    orders_data = []
+    not_found = []
+    for order_id in dict.fromkeys(order_ids):
+        order = simulator.get_order(order_id)
+        if not order:
+            not_found.append(order_id)
+            continue
+        order_item = {
+            "order_id": order["order_id"],
+            "product_id": order["product_id"],
+            "product_name": order["product_name"],
+            "status": order["current_state"],
+            "order_date": order["order_date"],
+            "expected_delivery": order["expected_delivery"],
+            "actual_delivery": order.get("actual_delivery"),
+            "price": float(order["price"]),
+            "user_id": order["user_id"],
+            "last_update": order["last_update"]
+        }
+        if order["stuck"]:
+            order_item["delay_reason"] = order.get("delay_reason", "unknown")
+        orders_data.append(order_item)
+    
+    if not orders_data:
+        return ToolResponse(
+            status=ToolStatus.NOT_FOUND,
+            error=f"Order IDs {', '.join(not_found) or '(none)'} not found"
+        )
+    
+    data = {"orders": orders_data, "not_found": not_found, "count": len(orders_data)}
+    if not_found:
         return ToolResponse(
             status=ToolStatus.PARTIAL,
-            data=inventory_data,
-            missing_fields=["stock"]
+            data=data,
+            missing_fields=[f"order {order_id}" for order_id in not_found]
         )
     
-    return ToolResponse(
-        status=ToolStatus.SUCCESS,
-        data=inventory_data
-    )
+    return ToolResponse(status=ToolStatus.SUCCESS, data=data)
 
 
 def get_user_orders(user_id: str, limit: int = 5) -> ToolResponse:
     """
-    Retrieves recent orders for a user from dynamic simulator
+    Retrieves recent orders for a user from dynamic simulator (newest first)
     Useful when user says "my last order" without providing order ID
     """
-    simulate_delay()
-    
+    return _call(_user_orders, user_id, limit)
+
+
+async def get_user_orders_async(user_id: str, limit: int = 5) -> ToolResponse:
+    """Async variant of get_user_orders (simulated latency does not block the loop)"""
+    return await _call_async(_user_orders, user_id, limit)
+
+
+def _user_orders(user_id: str, limit: int) -> ToolResponse:
+    # Simulate service failures
     if should_fail():
         return ToolResponse(
             status=ToolStatus.ERROR,
@@ -377,8 +620,8 @@ def get_user_orders(user_id: str, limit: int = 5) -> ToolResponse:
         )
     
     # Get orders from simulator
-    simulator = get_simulator()
-    user_orders = simulator.get_user_orders(user_id)
+    simulator = _sim()
+    user_orders = simulator.get_user_orders(user_id, limit=limit)
     
     if not user_orders:
         return ToolResponse(
@@ -386,27 +629,52 @@ def get_user_orders(user_id: str, limit: int = 5) -> ToolResponse:
             error=f"No orders found for user {user_id}"
         )
     
-    # Limit results
-    user_orders = user_orders[:limit]
+    # Convert to tool format (same field names as get_order_status)
+    orders_data = []
+    for order in user_orders:
+        order_item = {
+            "order_id": order["order_id"],
+            "product_id": order["product_id"],
+            "product_name": order["product_name"],
+            "status": order["current_state"],
+            "order_date": order["order_date"],
+            "price": float(order["price"]),
+            "user_id": order["user_id"]
+        }
+        orders_data.append(order_item)
     
     return ToolResponse(
         status=ToolStatus.SUCCESS,
-        data={"orders": user_orders, "count": len(user_orders)}
+        data={
+            "orders": orders_data,
+            "count": len(orders_data)
+        }
     )
 
 
-# Tool registry for the agent
-AVAILABLE_TOOLS = {
+# Tool registry for the agent (read-only view, built after every tool is defined)
+AVAILABLE_TOOLS = MappingProxyType({
     "get_order_status": {
         "function": get_order_status,
+        "async_function": get_order_status_async,
         "description": "Retrieves detailed order information including status, delivery dates, and tracking",
         "parameters": {
             "order_id": "string - The order ID to look up"
         },
         "returns": "Order details or error message"
     },
+    "get_orders_batch": {
+        "function": get_orders_batch,
+        "async_function": get_orders_batch_async,
+        "description": "Retrieves several orders at once (prefer over repeated get_order_status calls)",
+        "parameters": {
+            "order_ids": "list or comma-separated string - The order IDs to look up"
+        },
+        "returns": "Found orders plus the IDs that were not found"
+    },
     "get_refund_status": {
         "function": get_refund_status,
+        "async_function": get_refund_status_async,
         "description": "Checks if a refund exists for an order and its current status",
         "parameters": {
             "order_id": "string - The order ID to check for refunds"
@@ -415,14 +683,25 @@ AVAILABLE_TOOLS = {
     },
     "get_inventory": {
         "function": get_inventory,
+        "async_function": get_inventory_async,
         "description": "Checks product availability and stock levels",
         "parameters": {
             "product_id": "string - The product ID to check"
         },
         "returns": "Inventory information including stock count"
     },
+    "get_inventory_bulk": {
+        "function": get_inventory_bulk,
+        "async_function": get_inventory_bulk_async,
+        "description": "Checks stock for several products at once (prefer over repeated get_inventory calls)",
+        "parameters": {
+            "product_ids": "list or comma-separated string - The product IDs to check"
+        },
+        "returns": "Inventory for found products plus the IDs that were not found"
+    },
     "get_user_orders": {
         "function": get_user_orders,
+        "async_function": get_user_orders_async,
         "description": "Retrieves recent orders for a user (useful when order ID is not provided)",
         "parameters": {
             "user_id": "string - The user ID",
@@ -430,26 +709,72 @@ AVAILABLE_TOOLS = {
         },
         "returns": "List of user's recent orders"
     }
-}
+})
 
+# Flat name -> function tables for dispatch (one dict probe per call)
+_TOOL_FUNCS = {name: tool["function"] for name, tool in AVAILABLE_TOOLS.items()}
+_ASYNC_TOOL_FUNCS = {name: tool["async_function"] for name, tool in AVAILABLE_TOOLS.items()}
 
-def execute_tool(tool_name: str, **kwargs) -> ToolResponse:
+
+def execute_tool(tool_name: str, *args, **kwargs) -> ToolResponse:
     """
     Execute a tool by name with parameters
     Provides a unified interface for the agent
     """
-    if tool_name not in AVAILABLE_TOOLS:
+    tool_function = _TOOL_FUNCS.get(tool_name)
+    if tool_function is None:
         return ToolResponse(
             status=ToolStatus.ERROR,
             error=f"Unknown tool: {tool_name}"
         )
     
-    tool_function = AVAILABLE_TOOLS[tool_name]["function"]
+    try:
+        return tool_function(*args, **kwargs)
+    except Exception as e:
+        return ToolResponse(
+            status=ToolStatus.ERROR,
+            error=f"Tool execution failed: {str(e)}"
+        )
+
+
+async def execute_tool_async(tool_name: str, *args, **kwargs) -> ToolResponse:
+    """
+    Async variant of execute_tool
+    Awaits the tool's async variant, so concurrent calls overlap their latency on one loop
+    """
+    tool_function = _ASYNC_TOOL_FUNCS.get(tool_name)
+    if tool_function is None:
+        return ToolResponse(
+            status=ToolStatus.ERROR,
+            error=f"Unknown tool: {tool_name}"
+        )
     
     try:
-        return tool_function(**kwargs)
+        return await tool_function(*args, **kwargs)
     except Exception as e:
         return ToolResponse(
             status=ToolStatus.ERROR,
             error=f"Tool execution failed: {str(e)}"
         )
+
+
+async def execute_tools_batch_async(calls: List[Tuple[str, Dict[str, Any]]]) -> List[ToolResponse]:
+    """
+    Execute independent tool calls concurrently
+    
+    Args:
+        calls: (tool_name, kwargs) pairs
+    
+    Returns:
+        One ToolResponse per call, in call order. Wall time is that of the
+        slowest call rather than the sum.
+    """
+    return await asyncio.gather(*[execute_tool_async(name, **kwargs) for name, kwargs in calls])
+
+
+def execute_tools_batch(calls: List[Tuple[str, Dict[str, Any]]]) -> List[ToolResponse]:
+    """
+    Blocking wrapper around execute_tools_batch_async
+    Call from synchronous code only; inside a running event loop await the async variant
+    """
+    return asyncio.run(execute_tools_batch_async(calls))